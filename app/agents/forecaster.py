@@ -1,10 +1,16 @@
 # app/agents/forecaster.py
-from langchain.agents import create_react_agent, Tool
-import pandas as pd
-from prophet import Prophet
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from app.metrics import FORECAST_FIT_LATENCY
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 class ForecasterAgent:
     def __init__(self):
+        from langchain.agents import Tool
+
         # Add forecasting tools
         self.tools = [
             Tool(
@@ -23,8 +29,12 @@ class ForecasterAgent:
 
     def forecast_demand(self, historical_data: pd.DataFrame):
         """Use Prophet for time series forecasting"""
+        # Prophet (and its Stan backend) is only loaded for an actual forecast
+        from prophet import Prophet
+
         model = Prophet()
-        model.fit(historical_data)
+        with FORECAST_FIT_LATENCY.labels(model="prophet").time():
+            model.fit(historical_data)
         future = model.make_future_dataframe(periods=24, freq='H')
         forecast = model.predict(future)
         return forecast[['ds', 'yhat']]
@@ -1,9 +1,9 @@
 # app/database/redis_client.py
-import redis
-from langchain.memory import RedisChatMessageHistory
 
 class AgentMemory:
     def __init__(self):
+        import redis
+
         self.redis_client = redis.Redis(
             host='localhost',
             port=6379,
@@ -12,6 +12,8 @@ class AgentMemory:
     
     def save_conversation(self, session_id: str, messages: list):
         """Save conversation to Redis"""
+        from langchain.memory import RedisChatMessageHistory
+
         history = RedisChatMessageHistory(
             session_id=session_id,
             url="redis://localhost:6379"
@@ -21,6 +23,8 @@ class AgentMemory:
     
     def get_conversation(self, session_id: str):
         """Retrieve conversation from Redis"""
+        from langchain.memory import RedisChatMessageHistory
+
         history = RedisChatMessageHistory(
             session_id=session_id,
             url="redis://localhost:6379"
@@ -1,14 +1,15 @@
 # app/agents/renewable_expert.py
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain_core.tools import Tool
-from langchain_core.prompts import PromptTemplate
-from app.llm_setup import LLMFactory
-from app.tools.data_tools import Eco2mixDataTools
 
 class RenewableExpertAgent:
     def __init__(self):
+        from langchain.agents import AgentExecutor, create_react_agent
+        from langchain_core.tools import Tool
+        from langchain_core.prompts import PromptTemplate
+        from app.llm_setup import LLMFactory
+        from app.tools.data_tools import Eco2mixDataTools
+
         llm_factory = LLMFactory()
-        self.llm = llm_factory.get_llm(temperature=0.1)
+        self.llm = llm_factory.get_llm(temperature=0.1, agent="renewable_expert")
         self.data_tools = Eco2mixDataTools()
         
         # Define tools
@@ -28,13 +29,21 @@ class RenewableExpertAgent:
         # Create prompt
         prompt_template = """You are a Renewable Energy Expert specializing in France's electricity grid.
         
-        Available tools:
+        Answer the question using these tools:
         {tools}
         
         Use this format:
+        Question: the input question you must answer
+        Thought: what to do next
+        Action: the action to take, should be one of [{tool_names}]
+        Action Input: the input to the action
+        Observation: the result of the action
+        ... (Thought/Action/Action Input/Observation can repeat)
+        Thought: I now know the final answer
+        Final Answer: the final answer to the question
+        
         Question: {input}
-        Thought: {agent_scratchpad}
-        """
+        Thought: {agent_scratchpad}"""
         
         self.prompt = PromptTemplate.from_template(prompt_template)
         
@@ -0,0 +1,329 @@
+# app/cache.py
+"""Two-level cache shared across uvicorn workers and replicas.
+
+L1 is an in-process LRU with a short TTL; L2 is Redis (docker-compose
+`redis` service). Misses are loaded through a single flight: one thread per
+process and one process per cluster (Redis SET NX lock) calls the loader,
+the others wait for its result. Namespaces are invalidated by bumping a
+generation counter in Redis and publishing it, so every worker drops its L1
+entries at once. Without Redis the cache degrades to L1 only.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from app import config
+from app.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "energy:cache:invalidate"
+
+# Namespaces
+SNAPSHOTS = "eco2mix"
+ANALYTICS = "analytics"
+LLM_ANSWERS = "llm"
+
+_MISSING = object()
+
+# Release the lock only if we still own it
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class LocalLRU:
+    """Thread-safe LRU with per-entry expiry"""
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisConnection:
+    """Lazily connected Redis client that backs off while Redis is down"""
+    def __init__(self, url: str = None, retry_after: float = 30.0, client=None):
+        self.url = url
+        self.retry_after = retry_after
+        self._client = client
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Redis client, or None while Redis is unavailable"""
+        if self._client is not None:
+            return self._client
+        if time.monotonic() < self._down_until:
+            return None
+        with self._lock:
+            if self._client is None and time.monotonic() >= self._down_until:
+                try:
+                    import redis
+                    client = redis.Redis.from_url(
+                        self.url or config.REDIS_URL,
+                        socket_connect_timeout=0.25,
+                        socket_timeout=1.0,
+                    )
+                    client.ping()
+                    self._client = client
+                except Exception as e:
+                    self.mark_down(e)
+        return self._client
+
+    def mark_down(self, error):
+        logger.warning(f"Redis unavailable, using in-process cache only for {self.retry_after}s: {error}")
+        self._client = None
+        self._down_until = time.monotonic() + self.retry_after
+
+
+class TwoLevelCache:
+    def __init__(self, namespace: str, ttl: float = 300, local_ttl: float = None,
+                 local_size: int = 1024, connection: RedisConnection = None,
+                 lock_ttl: float = 30.0, wait_interval: float = 0.05):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local_ttl = local_ttl if local_ttl is not None else config.CACHE_LOCAL_TTL
+        self.local = LocalLRU(local_size)
+        self.connection = connection or default_connection
+        self.lock_ttl = lock_ttl
+        self.wait_interval = wait_interval
+        self.generation = None
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+    # -- keys ----------------------------------------------------------------
+
+    def _generation_key(self) -> str:
+        return f"cache:{self.namespace}:gen"
+
+    def _redis_key(self, client, key: str) -> str:
+        if self.generation is None:
+            self.generation = int(client.get(self._generation_key()) or 0)
+        return f"cache:{self.namespace}:{self.generation}:{key}"
+
+    # -- reads and writes ----------------------------------------------------
+
+    def get(self, key: str, default=None):
+        value = self._get(key)
+        return default if value is _MISSING else value
+
+    def _get(self, key: str):
+        value = self.local.get(key)
+        record_cache(f"{self.namespace}.local", value is not _MISSING)
+        if value is not _MISSING:
+            return value
+
+        client = self.connection.get()
+        if client is None:
+            return _MISSING
+        try:
+            raw = client.get(self._redis_key(client, key))
+        except Exception as e:
+            self.connection.mark_down(e)
+            return _MISSING
+        record_cache(f"{self.namespace}.redis", raw is not None)
+        if raw is None:
+            return _MISSING
+        value = json.loads(raw)
+        self.local.set(key, value, min(self.local_ttl, self.ttl))
+        return value
+
+    def set(self, key: str, value, ttl: float = None):
+        ttl = ttl or self.ttl
+        client = self.connection.get()
+        if client is None:
+            # L1 is the only copy, so keep it for the full TTL
+            self.local.set(key, value, ttl)
+            return
+        self.local.set(key, value, min(self.local_ttl, ttl))
+        try:
+            client.set(self._redis_key(client, key), json.dumps(value), px=int(ttl * 1000))
+        except Exception as e:
+            self.connection.mark_down(e)
+
+    def get_or_set(self, key: str, loader, ttl: float = None):
+        """Return the cached value or load it once (per process and per cluster)"""
+        value = self._get(key)
+        if value is not _MISSING:
+            return value
+
+        # One loader per key in this process
+        with self._flights_lock:
+            flight = self._flights.setdefault(key, threading.Lock())
+        with flight:
+            try:
+                value = self.local.get(key)
+                if value is not _MISSING:
+                    return value
+                return self._load_once(key, loader, ttl)
+            finally:
+                with self._flights_lock:
+                    self._flights.pop(key, None)
+
+    def _load_once(self, key: str, loader, ttl: float = None):
+        """One loader per key across processes, via a Redis lock"""
+        client = self.connection.get()
+        if client is None:
+            value = loader()
+            self.set(key, value, ttl)
+            return value
+
+        token = uuid.uuid4().hex
+        lock_key = f"lock:{self.namespace}:{key}"
+        try:
+            acquired = client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as e:
+            self.connection.mark_down(e)
+            acquired = True
+
+        if not acquired:
+            # Another worker is loading: wait for its result rather than calling upstream too
+            deadline = time.monotonic() + self.lock_ttl
+            while time.monotonic() < deadline:
+                time.sleep(self.wait_interval)
+                value = self._get(key)
+                if value is not _MISSING:
+                    return value
+                try:
+                    if not client.exists(lock_key):
+                        break
+                except Exception as e:
+                    self.connection.mark_down(e)
+                    break
+
+        try:
+            value = loader()
+            self.set(key, value, ttl)
+            return value
+        finally:
+            if acquired:
+                try:
+                    client.eval(_RELEASE_LOCK, 1, lock_key, token)
+                except Exception:
+                    pass
+
+    # -- invalidation --------------------------------------------------------
+
+    def invalidate(self):
+        """Drop every entry in this namespace, on all workers"""
+        self.local.clear()
+        client = self.connection.get()
+        if client is None:
+            return
+        try:
+            generation = client.incr(self._generation_key())
+            self.generation = generation
+            client.publish(INVALIDATION_CHANNEL, json.dumps({"namespace": self.namespace, "generation": generation}))
+        except Exception as e:
+            self.connection.mark_down(e)
+
+    def apply_invalidation(self, generation: int):
+        """Handle an invalidation published by another worker"""
+        self.generation = generation
+        self.local.clear()
+
+    def resync(self):
+        """Re-read the generation from Redis and drop L1 (invalidations may have been missed)"""
+        self.generation = None
+        self.local.clear()
+
+
+class InvalidationListener:
+    """Background pub/sub subscriber applying invalidations to local caches"""
+    def __init__(self, connection: RedisConnection = None):
+        self.connection = connection or default_connection
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            client = self.connection.get()
+            if client is None:
+                self._stop.wait(5)
+                continue
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Catch up on invalidations published before this (re)subscription
+                for cache in list(_caches.values()):
+                    cache.resync()
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message:
+                        payload = json.loads(message["data"])
+                        cache = _caches.get(payload["namespace"])
+                        if cache is not None:
+                            cache.apply_invalidation(int(payload["generation"]))
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error: {e}")
+                # Invalidations published while disconnected may have been missed
+                for cache in list(_caches.values()):
+                    cache.resync()
+                self._stop.wait(1)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+default_connection = RedisConnection()
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str, ttl: float = None) -> TwoLevelCache:
+    """Shared cache instance for a namespace.
+
+    `ttl` sets the namespace's default entry lifetime when it is created
+    (300 s if not given); asking again with a different one raises
+    ValueError. Pass ttl to set()/get_or_set() for per-entry lifetimes.
+    """
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _caches[namespace] = TwoLevelCache(namespace, ttl=ttl or 300)
+        elif ttl is not None and ttl != cache.ttl:
+            raise ValueError(f"Cache {namespace} already exists with ttl={cache.ttl}, not {ttl}")
+        return cache
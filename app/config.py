@@ -0,0 +1,33 @@
+# app/config.py
+import os
+
+# eco2mix (ODRE) API root; point at a local stub for offline runs
+ECO2MIX_API_ROOT = os.getenv(
+    "ECO2MIX_API_ROOT",
+    "https://odre.opendatasoft.com/api/explore/v2.1/catalog/datasets"
+)
+
+# Local services
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+CHROMA_HOST = os.getenv("CHROMA_HOST", "localhost")
+CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
+
+# On-disk cache of the router's intent centroids
+ROUTER_CACHE_PATH = os.getenv("ROUTER_CACHE_PATH", ".cache/router_centroids.json")
+
+# Region-partitioned store of normalized eco2mix records (SQLite)
+REGION_STORE_PATH = os.getenv("REGION_STORE_PATH", ".cache/eco2mix.sqlite3")
+# Days of real-time rows kept per region; older history comes from the consolidated backfill
+REALTIME_RETENTION_DAYS = float(os.getenv("REALTIME_RETENTION_DAYS", "31"))
+
+# Shared cache tier (docker-compose redis service) and in-process L1 TTL (seconds)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_LOCAL_TTL = float(os.getenv("CACHE_LOCAL_TTL", "10"))
+
+# eco2mix poller interval in seconds (0 disables it); one leader polls per cluster
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "300"))
+
+# uvicorn worker processes for python -m app.main
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+# Where workers write Prometheus samples when API_WORKERS > 1 (emptied at startup)
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", ".cache/prometheus")
@@ -1,18 +1,17 @@
-import chromadb
-from chromadb.config import Settings
-from langchain_community.vectorstores import Chroma
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
-from langchain_core.tools import tool
-
-
 import os
+from app import config
+from app.metrics import RAG_LATENCY
 
 class EnergyRAGSystem:
-    def __init__(self, embedding_model="nomic-embed-text"):
-        self.client = chromadb.HttpClient(
-            host="localhost",
-            port=8000,
+    def __init__(self, embedding_model="nomic-embed-text", client=None):
+        # chromadb and langchain are imported on first use, not at module load
+        import chromadb
+        from chromadb.config import Settings
+
+        # Allow an injected client (e.g. chromadb.EphemeralClient for benchmarks)
+        self.client = client or chromadb.HttpClient(
+            host=config.CHROMA_HOST,
+            port=config.CHROMA_PORT,
             settings=Settings(allow_reset=True)
         )
         
@@ -23,6 +22,10 @@ class EnergyRAGSystem:
         
     def ingest_documents(self, docs_path: str):
         """Ingest energy documents into vector store"""
+        from langchain_community.document_loaders import PyPDFLoader, TextLoader
+        from langchain_community.vectorstores import Chroma
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
         documents = []
         
         # Load all PDFs in directory
@@ -41,28 +44,34 @@ class EnergyRAGSystem:
         )
         splits = text_splitter.split_documents(documents)
         
-        # Create vector store
-        vector_store = Chroma.from_documents(
-            documents=splits,
-            embedding=self.embeddings,
-            client=self.client,
-            collection_name="energy_documents"
-        )
+        # Create vector store (embeds every chunk)
+        with RAG_LATENCY.labels(operation="index").time():
+            vector_store = Chroma.from_documents(
+                documents=splits,
+                embedding=self.embeddings,
+                client=self.client,
+                collection_name="energy_documents"
+            )
         
         return f"Ingested {len(splits)} chunks from {len(documents)} documents"
     
     def query_documents(self, query: str, k: int = 3):
         """Query the RAG system"""
+        from langchain_community.vectorstores import Chroma
+
         vector_store = Chroma(
             client=self.client,
             collection_name="energy_documents",
             embedding_function=self.embeddings
         )
         
-        results = vector_store.similarity_search(query, k=k)
+        # Embed and retrieve separately so each step is timed on its own
+        with RAG_LATENCY.labels(operation="embed_query").time():
+            embedding = self.embeddings.embed_query(query)
+        with RAG_LATENCY.labels(operation="retrieve").time():
+            results = vector_store.similarity_search_by_vector(embedding, k=k)
         return "\n\n".join([doc.page_content for doc in results])
     
-    @tool
     def search_energy_policies(self, query: str):
         """Search energy policy documents for relevant information"""
         return self.query_documents(query)
\ No newline at end of file
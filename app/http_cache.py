@@ -0,0 +1,131 @@
+# app/http_cache.py
+"""HTTP validators and compression for API responses.
+
+eco2mix publishes at most every 15 minutes, so responses are tagged with an
+ETag / Last-Modified derived from the snapshot they were built from and
+polling clients get a bodiless 304 until the next publication.
+"""
+import gzip
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESS_MIN_SIZE = 1024
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+
+def snapshot_time(record: dict):
+    """Publication time of an eco2mix record (UTC), if it can be parsed"""
+    value = record.get('date_heure') or record.get('date')
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over the snapshot identity and request-specific parts"""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" match
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def not_modified(request: Request, etag: str, last_modified: datetime = None) -> bool:
+    """Evaluate If-None-Match, then If-Modified-Since (RFC 9110 precedence)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def validator_headers(etag: str, last_modified: datetime = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def conditional_json(request: Request, etag: str, last_modified: datetime, build):
+    """304 if the client's copy is current, otherwise `build()` as tagged JSON.
+
+    `build` is only called on a miss, so a revalidation skips the work too.
+    """
+    headers = validator_headers(etag, last_modified)
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build(), headers=headers)
+
+
+def choose_encoding(accept_encoding: str):
+    """Preferred supported content-coding from Accept-Encoding"""
+    offered = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip()] = quality
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+async def compress_response(request: Request, response):
+    """Compress large JSON/text bodies with brotli or gzip"""
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    content_type = response.headers.get("content-type", "")
+    if (encoding is None or response.status_code != 200
+            or "content-encoding" in response.headers
+            or not content_type.startswith(COMPRESSIBLE_TYPES)):
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    if len(body) >= COMPRESS_MIN_SIZE:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    vary = headers.pop("vary", None)
+    headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+    return Response(content=body, status_code=response.status_code, headers=headers,
+                    background=response.background)
@@ -1,22 +1,57 @@
 # app/llm_setup.py
+import time
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_ollama import OllamaLLM, OllamaEmbeddings
+from app import config
+from app.metrics import LLM_LATENCY, LLM_TOKENS
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """Record LLM call latency and token counts per agent"""
+    def __init__(self, agent: str, model: str):
+        self.agent = agent
+        self.model = model
+        self._starts = {}
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._starts[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._observe(run_id)
+        for generations in response.generations:
+            for generation in generations:
+                info = generation.generation_info or {}
+                prompt_tokens = info.get('prompt_eval_count') or 0
+                completion_tokens = info.get('eval_count') or 0
+                LLM_TOKENS.labels(agent=self.agent, model=self.model, kind="prompt").inc(prompt_tokens)
+                LLM_TOKENS.labels(agent=self.agent, model=self.model, kind="completion").inc(completion_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._observe(run_id)
+
+    def _observe(self, run_id):
+        start = self._starts.pop(run_id, None)
+        if start is not None:
+            LLM_LATENCY.labels(agent=self.agent, model=self.model).observe(time.perf_counter() - start)
+
 
 class LLMFactory:
-    def __init__(self):
-        self.base_url = "http://localhost:11434"
-        
-    def get_llm(self, model="llama3.1:8b", temperature=0.1):
+    def __init__(self, base_url: str = None):
+        self.base_url = base_url or config.OLLAMA_BASE_URL
+
+    def get_llm(self, model="llama3.1:8b", temperature=0.1, agent="default"):
         """Get Ollama LLM instance"""
         return OllamaLLM(
             model=model,
             base_url=self.base_url,
             temperature=temperature,
-            num_predict=2048
+            num_predict=2048,
+            callbacks=[LLMMetricsHandler(agent, model)]
         )
-    
+
     def get_embeddings(self, model="nomic-embed-text"):
         """Get embeddings for RAG"""
         return OllamaEmbeddings(
             model=model,
             base_url=self.base_url
-        )
\ No newline at end of file
+        )
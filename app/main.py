@@ -1,18 +1,45 @@
 # app/main.py - UPDATED WITH NULL HANDLING
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Request, Response
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
 import traceback
 import logging
 import requests
-from datetime import datetime
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from starlette.routing import Match
+from app import config
+from app.cache import ANALYTICS, InvalidationListener, get_cache
+from app.http_cache import compress_response, conditional_json, make_etag, snapshot_time
+from app.metrics import REQUEST_LATENCY, mark_worker_dead, prepare_multiprocess_dir, render_metrics
+from app.poller import Eco2mixPoller
+from app.registry import registry
+from app.tools.analytics import analyze_snapshot, compare_regions, extract_snapshot, region_snapshot
+from app.tools.datasets import NATIONAL, REGIONS, find_regions
+from app.tools.feeds import latest_feed, mix_feed, series_feed
+from app.tools.eco2mix_client import MAX_LIMIT, Eco2mixError
+from app.tools.resilience import CircuitOpenError, breaker_status
+from app.tools.regional import latest_by_region
+from app.tools.snapshots import (
+    SNAPSHOT_LIMIT, get_latest, latest_published, snapshot_id, snapshot_status, snapshot_ttl,
+)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="France Energy AI Analyst API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the shared-cache invalidation listener and the eco2mix poller"""
+    listener = InvalidationListener().start()
+    poller = Eco2mixPoller().start()
+    yield
+    poller.stop()
+    listener.stop()
+    mark_worker_dead()
+
+app = FastAPI(title="France Energy AI Analyst API", lifespan=lifespan)
 
 # Add CORS
 app.add_middleware(
@@ -23,19 +50,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class Query(BaseModel):
-    query: str
+def endpoint_label(request: Request):
+    """Route template for metrics labels (bounded cardinality)"""
+    for route in app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
 
-def safe_get(data, key, default=0):
-    """Safely get value from dict, handling None/null"""
-    value = data.get(key)
-    if value is None:
-        return default
+@app.middleware("http")
+async def compress(request: Request, call_next):
+    """gzip/brotli for large bodies"""
+    return await compress_response(request, await call_next(request))
+
+# Registered last so it is outermost and times the full request
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Record per-endpoint request latency"""
+    start = time.perf_counter()
+    status = 500
     try:
-        # Try to convert to float if it's a string number
-        return float(value)
-    except (ValueError, TypeError):
-        return default
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        REQUEST_LATENCY.labels(
+            method=request.method,
+            endpoint=endpoint_label(request),
+            status=str(status)
+        ).observe(time.perf_counter() - start)
+
+class Query(BaseModel):
+    query: str
 
 @app.get("/")
 async def root():
@@ -46,125 +92,74 @@ async def root():
             "GET /": "This page",
             "POST /analyze": "Analyze energy query",
             "GET /health": "Health check",
-            "GET /data": "Get raw energy data"
+            "GET /data": "Get raw energy data",
+            "GET /regions": "Latest data per region",
+            "GET /feeds/latest": "Dashboard feed: latest snapshot",
+            "GET /feeds/mix": "Dashboard feed: production mix",
+            "GET /feeds/series": "Dashboard feed: downsampled time series",
+            "GET /metrics": "Prometheus metrics"
         }
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
+# Blocking handlers are plain `def` so FastAPI runs them in its threadpool
 @app.post("/analyze")
-async def analyze_energy(query: Query):
+def analyze_energy(query: Query, request: Request):
     """Main endpoint for energy analysis"""
     try:
         logger.info(f"Received query: {query.query}")
         
-        # Get real data from eco2mix API
-        api_url = "https://odre.opendatasoft.com/api/explore/v2.1/catalog/datasets/eco2mix-national-tr/records"
-        params = {"limit": 1, "order_by": "date desc"}
-        
-        response = requests.get(api_url, params=params, timeout=10)
+        # Region questions are answered from the region store
+        regions = find_regions(query.query)
+        if regions:
+            return analyze_regions(query, regions, request)
         
-        if response.status_code != 200:
+        # Latest eco2mix data, shared across workers
+        try:
+            results, stale = get_latest(limit=SNAPSHOT_LIMIT, timeout=10)
+        except (Eco2mixError, CircuitOpenError) as e:
             return {
                 "status": "error",
-                "message": f"API returned status {response.status_code}",
+                "message": str(e),
                 "query": query.query
             }
         
-        data = response.json()
-        
-        if not data.get('results'):
+        if not results:
             return {
                 "status": "error",
                 "message": "No data available from API",
                 "query": query.query
             }
         
-        latest = data['results'][0]
-        
-        # Extract data with safe handling of nulls
-        production = safe_get(latest, 'production')
-        consumption = safe_get(latest, 'consommation')
-        nuclear = safe_get(latest, 'nucleaire')
-        wind = safe_get(latest, 'eolien')
-        solar = safe_get(latest, 'solaire')
-        hydro = safe_get(latest, 'hydraulique')
-        gas = safe_get(latest, 'gaz')
-        carbon_intensity = safe_get(latest, 'taux_co2')
-        timestamp = latest.get('date', 'N/A')
-        
-        # Simple analysis based on query
-        query_lower = query.query.lower()
-        
-        if "nuclear" in query_lower:
-            total = production if production > 0 else 1  # Avoid division by zero
-            percent = (nuclear / total) * 100 if total > 0 else 0
-            analysis = f"Nuclear power provides {percent:.1f}% of France's electricity ({nuclear} MW out of {production} MW total)."
-        
-        elif "wind" in query_lower:
-            total = production if production > 0 else 1
-            percent = (wind / total) * 100 if total > 0 else 0
-            analysis = f"Wind power provides {percent:.1f}% of France's electricity ({wind} MW out of {production} MW total)."
+        # Newest quarter-hour with values, so filling it in changes the validators
+        latest = latest_published(results)
         
-        elif "solar" in query_lower:
-            total = production if production > 0 else 1
-            percent = (solar / total) * 100 if total > 0 else 0
-            analysis = f"Solar power provides {percent:.1f}% of France's electricity ({solar} MW out of {production} MW total)."
-        
-        elif "renewable" in query_lower or "green" in query_lower:
-            renewables = wind + solar + hydro
-            total = production if production > 0 else 1
-            percent = (renewables / total) * 100 if total > 0 else 0
-            analysis = f"Renewables provide {percent:.1f}% of electricity: Wind: {wind} MW, Solar: {solar} MW, Hydro: {hydro} MW."
-        
-        elif "mix" in query_lower:
-            total = nuclear + wind + solar + hydro + gas
-            if total > 0:
-                analysis = f"Energy mix:\n"
-                analysis += f"- Nuclear: {(nuclear/total*100):.1f}% ({nuclear} MW)\n"
-                analysis += f"- Wind: {(wind/total*100):.1f}% ({wind} MW)\n"
-                analysis += f"- Solar: {(solar/total*100):.1f}% ({solar} MW)\n"
-                analysis += f"- Hydro: {(hydro/total*100):.1f}% ({hydro} MW)\n"
-                analysis += f"- Gas: {(gas/total*100):.1f}% ({gas} MW)\n"
-                analysis += f"Total: {total} MW"
-            else:
-                analysis = "No production data available."
-        
-        elif "carbon" in query_lower or "co2" in query_lower:
-            analysis = f"Carbon intensity: {carbon_intensity} gCO₂/kWh"
-            if carbon_intensity < 50:
-                analysis += " (Very low carbon)"
-            elif carbon_intensity < 100:
-                analysis += " (Low carbon)"
-            else:
-                analysis += " (Moderate carbon)"
-        
-        elif "consumption" in query_lower:
-            analysis = f"Consumption: {consumption} MW, Production: {production} MW"
-            balance = production - consumption
-            if balance > 0:
-                analysis += f" (Exporting {balance} MW)"
-            else:
-                analysis += f" (Importing {-balance} MW)"
-        
-        else:
-            analysis = f"France's electricity: Production {production} MW, Consumption {consumption} MW. "
-            analysis += f"Nuclear: {nuclear} MW, Wind: {wind} MW, Solar: {solar} MW."
-        
-        return {
-            "status": "success",
-            "query": query.query,
-            "analysis": analysis,
-            "data": {
-                "timestamp": timestamp,
-                "production_MW": production,
-                "consumption_MW": consumption,
-                "nuclear_MW": nuclear,
-                "wind_MW": wind,
-                "solar_MW": solar,
-                "hydro_MW": hydro,
-                "gas_MW": gas,
-                "carbon_intensity": carbon_intensity
+        def build():
+            data = extract_snapshot(latest)
+            # Same router as the workflow supervisor
+            decision = registry.get("router").route(query.query)
+            analysis = get_cache(ANALYTICS).get_or_set(
+                f"analyze:{decision.intent}:{snapshot_id(latest)}",
+                lambda: analyze_snapshot(decision.intent, data),
+                ttl=snapshot_ttl()
+            )
+            return {
+                "status": "success",
+                "query": query.query,
+                "intent": decision.intent,
+                "analysis": analysis,
+                "data": data,
+                "stale": stale
             }
-        }
+        
+        # Unchanged snapshot + same query -> 304 without routing or analysis
+        etag = make_etag(snapshot_id(latest), "analyze", query.query)
+        return conditional_json(request, etag, snapshot_time(latest), build)
         
     except Exception as e:
         logger.error(f"Error in /analyze: {e}")
@@ -175,19 +170,52 @@ async def analyze_energy(query: Query):
             "query": query.query if 'query' in locals() else "Unknown"
         }
 
+def latest_regions(regions: list):
+    """Latest store rows for regions, with validators over their timestamps"""
+    rows = latest_by_region(regions, max_age=snapshot_ttl())
+    if not rows:
+        return rows, None, None
+    stamps = [rows[code]["ts"] for code in sorted(rows)]
+    return rows, make_etag(*stamps), datetime.fromisoformat(max(stamps))
+
+def analyze_regions(query: Query, regions: list, request: Request):
+    """Compare regions with one indexed read of the region store"""
+    rows, etag, last_modified = latest_regions(regions)
+    if not rows:
+        return {
+            "status": "error",
+            "message": "No regional data available",
+            "query": query.query
+        }
+    
+    def build():
+        decision = registry.get("router").route(query.query)
+        data = {REGIONS[code]: region_snapshot(rows[code]) for code in regions if code in rows}
+        return {
+            "status": "success",
+            "query": query.query,
+            "intent": decision.intent,
+            "analysis": compare_regions(decision.intent, data),
+            "regions": data
+        }
+    
+    return conditional_json(request, make_etag(etag, "analyze", query.query), last_modified, build)
+
 @app.get("/health")
-async def health_check():
-    """Health check endpoint"""
+def health_check():
+    """Health check endpoint (reports breaker state; never calls eco2mix itself)"""
     try:
-        # Check eco2mix API
-        api_url = "https://odre.opendatasoft.com/api/explore/v2.1/catalog/datasets/eco2mix-national-tr/records"
-        api_response = requests.get(api_url, params={"limit": 1}, timeout=10)
-        api_ok = api_response.status_code == 200
+        circuits = breaker_status()
+        snapshot = snapshot_status()
+        api_ok = all(c["state"] == "closed" for c in circuits.values())
+        data_ok = snapshot["available"] and not snapshot["stale"]
         
         return {
-            "status": "healthy" if api_ok else "degraded",
+            "status": "healthy" if api_ok and data_ok else "degraded",
             "service": "energy-ai-analyst",
             "eco2mix_api": "connected" if api_ok else "disconnected",
+            "circuits": circuits,
+            "snapshot": snapshot,
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
@@ -198,33 +226,109 @@ async def health_check():
         }
 
 @app.get("/data")
-async def get_data(limit: int = 3):
+def get_data(request: Request, limit: int = 3):
     """Get raw energy data with null handling"""
+    if not 1 <= limit <= MAX_LIMIT:
+        return {"status": "error", "message": f"limit must be between 1 and {MAX_LIMIT}"}
     try:
-        api_url = "https://odre.opendatasoft.com/api/explore/v2.1/catalog/datasets/eco2mix-national-tr/records"
-        response = requests.get(api_url, params={"limit": limit, "order_by": "date desc"})
+        try:
+            snapshot, stale = get_latest(limit=max(limit, SNAPSHOT_LIMIT), timeout=10)
+        except Eco2mixError as e:
+            return {"status": "error", "message": f"API error: {e.status_code}"}
+        except CircuitOpenError as e:
+            return {"status": "error", "message": str(e)}
         
-        if response.status_code != 200:
-            return {"status": "error", "message": f"API error: {response.status_code}"}
+        records = snapshot[:limit]
+
+        def build():
+            # Process data to handle nulls
+            processed_results = []
+            for record in records:
+                processed = {}
+                for key, value in record.items():
+                    processed[key] = value if value is not None else 0
+                processed_results.append(processed)
+            
+            return {
+                "status": "success",
+                "count": len(processed_results),
+                "data": processed_results,
+                "stale": stale
+            }
         
-        data = response.json()
+        if not records:
+            return build()
+        # Tagged with the newest filled-in row: unfilled rows get values without a new date_heure
+        published = latest_published(snapshot)
+        etag = make_etag(snapshot_id(published), "data", limit)
+        return conditional_json(request, etag, snapshot_time(published), build)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@app.get("/regions")
+def get_regions(request: Request, region: str = None):
+    """Latest data per region; `region` takes comma-separated INSEE codes or names"""
+    try:
+        if region:
+            codes = [c.strip() for c in region.split(",") if c.strip() in REGIONS]
+            regions = codes + [c for c in find_regions(region) if c not in codes]
+        else:
+            regions = list(REGIONS)
+        if not regions:
+            return {"status": "error", "message": f"Unknown region: {region}"}
         
-        # Process data to handle nulls
-        processed_results = []
-        for record in data.get('results', []):
-            processed = {}
-            for key, value in record.items():
-                processed[key] = value if value is not None else 0
-            processed_results.append(processed)
+        rows, etag, last_modified = latest_regions(regions)
         
-        return {
-            "status": "success",
-            "count": len(processed_results),
-            "data": processed_results
-        }
+        def build():
+            data = [{"code": code, "region": REGIONS[code], **region_snapshot(rows[code])}
+                    for code in regions if code in rows]
+            return {
+                "status": "success",
+                "count": len(data),
+                "data": data
+            }
+        
+        if not rows:
+            return build()
+        return conditional_json(request, make_etag(etag, "regions", ",".join(regions)), last_modified, build)
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+def feed_response(request: Request, name: str, feed, *params):
+    """Tag a dashboard feed with validators from the data it was built from"""
+    try:
+        version, payload = feed()
+    except (Eco2mixError, CircuitOpenError, requests.RequestException, ValueError) as e:
+        return {"status": "error", "message": str(e)}
+    if not version:
+        return {"status": "success", **payload}
+    etag = make_etag(version, "feeds", name, *params)
+    last_modified = datetime.fromisoformat(version.replace("Z", "+00:00")).astimezone(timezone.utc)
+    return conditional_json(request, etag, last_modified, lambda: {"status": "success", **payload})
+
+@app.get("/feeds/latest")
+def feed_latest(request: Request):
+    """Latest national snapshot for the dashboard"""
+    return feed_response(request, "latest", latest_feed)
+
+@app.get("/feeds/mix")
+def feed_mix(request: Request, region: str = NATIONAL):
+    """Precomputed production mix of France (FR) or a region (INSEE code)"""
+    return feed_response(request, "mix", lambda: mix_feed(region), region)
+
+@app.get("/feeds/series")
+def feed_series(request: Request, column: str = "consumption", region: str = NATIONAL,
+                days: float = 7, points: int = 2000, method: str = "lttb"):
+    """`days` of one column, downsampled server-side (lttb or minmax) to about `points` points"""
+    return feed_response(request, "series", lambda: series_feed(column, region, days, points, method),
+                         column, region, days, points, method)
+
 if __name__ == "__main__":
+    import uvicorn
+
     logger.info("Starting France Energy AI API...")
-    uvicorn.run(app, host="0.0.0.0", port=8001, log_level="info")
\ No newline at end of file
+    if config.API_WORKERS > 1:
+        # Each worker has its own metrics registry; /metrics merges them from this directory
+        prepare_multiprocess_dir(config.PROMETHEUS_MULTIPROC_DIR)
+    # Workers share eco2mix snapshots, analytics and LLM answers through Redis
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8001, log_level="info", workers=config.API_WORKERS)
\ No newline at end of file
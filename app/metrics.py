@@ -0,0 +1,124 @@
+# app/metrics.py
+"""Prometheus metrics.
+
+With several uvicorn workers each process has its own registry, so
+python -m app.main points PROMETHEUS_MULTIPROC_DIR at a shared directory
+and /metrics aggregates every worker's samples from it.
+"""
+import os
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+# Buckets tuned for a mix of sub-millisecond cache hits and multi-second LLM calls
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+# API
+REQUEST_LATENCY = Histogram(
+    "energy_api_request_seconds",
+    "HTTP request latency per endpoint",
+    ["method", "endpoint", "status"],
+    buckets=FAST_BUCKETS,
+)
+
+# Upstream eco2mix API
+UPSTREAM_LATENCY = Histogram(
+    "energy_upstream_fetch_seconds",
+    "eco2mix API fetch latency",
+    ["dataset", "status"],
+    buckets=FAST_BUCKETS,
+)
+
+UPSTREAM_STALE_SERVED = Counter(
+    "energy_upstream_stale_served_total",
+    "Responses served from a stale eco2mix snapshot",
+    ["dataset"],
+)
+CIRCUIT_STATE = Gauge(
+    "energy_circuit_state",
+    "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ["name"],
+    # Worst state among live workers
+    multiprocess_mode="livemax",
+)
+
+# Caches (hit ratio = hits / (hits + misses))
+CACHE_REQUESTS = Counter(
+    "energy_cache_requests_total",
+    "Cache lookups by cache name and result",
+    ["cache", "result"],
+)
+
+# LLM calls
+LLM_LATENCY = Histogram(
+    "energy_llm_call_seconds",
+    "LLM call latency per agent",
+    ["agent", "model"],
+    buckets=SLOW_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "energy_llm_tokens_total",
+    "LLM tokens per agent",
+    ["agent", "model", "kind"],
+)
+
+# Query routing
+ROUTE_LATENCY = Histogram(
+    "energy_route_seconds",
+    "Query routing latency by decision source",
+    ["source"],
+    buckets=FAST_BUCKETS,
+)
+
+# Workflow, RAG and forecasting
+WORKFLOW_NODE_LATENCY = Histogram(
+    "energy_workflow_node_seconds",
+    "EnergyWorkflow node execution time",
+    ["node"],
+    buckets=SLOW_BUCKETS,
+)
+RAG_LATENCY = Histogram(
+    "energy_rag_seconds",
+    "EnergyRAGSystem latency per operation",
+    ["operation"],
+    buckets=FAST_BUCKETS,
+)
+FORECAST_FIT_LATENCY = Histogram(
+    "energy_forecast_fit_seconds",
+    "Forecast model fit time",
+    ["model"],
+    buckets=SLOW_BUCKETS,
+)
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache lookup as a hit or a miss"""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def render_metrics():
+    """Return the Prometheus exposition payload and its content type"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: int = None):
+    """Drop a stopped worker's live gauges from the multiprocess directory"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def prepare_multiprocess_dir(path: str):
+    """Empty `path` and point PROMETHEUS_MULTIPROC_DIR at it (before workers start)"""
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        if name.endswith(".db"):
+            os.remove(os.path.join(path, name))
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
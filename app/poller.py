@@ -0,0 +1,111 @@
+# app/poller.py
+import logging
+import socket
+import threading
+import uuid
+
+from app import config
+from app.cache import ANALYTICS, LLM_ANSWERS, default_connection, get_cache
+from app.tools.datasets import DATASETS, normalize
+from app.tools.feeds import warm_feeds
+from app.tools.region_store import get_store
+from app.tools.regional import ingest_regions
+from app.tools.snapshots import SNAPSHOT_LIMIT, fetch_latest, get_latest_records, latest_snapshots, publication_id
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "poller:eco2mix:leader"
+# The region store is a file per host, so each host elects its own ingesting worker
+STORE_LEADER_KEY = f"poller:store:{socket.gethostname()}"
+
+
+class Eco2mixPoller:
+    """Refresh the shared eco2mix snapshot and invalidate derived caches on new data.
+
+    Every worker runs a poller, but each cycle only the one holding the Redis
+    leader key calls eco2mix, so upstream load does not grow with workers.
+    On every host, one worker then fills that host's region store from the
+    shared tier (national snapshot and regional feeds) and prunes real-time
+    rows older than REALTIME_RETENTION_DAYS.
+    """
+    def __init__(self, interval: float = None, connection=None):
+        self.interval = interval if interval is not None else config.POLL_INTERVAL
+        self.connection = connection or default_connection
+        self.token = uuid.uuid4().hex
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="eco2mix-poller", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def is_leader(self, key: str = LEADER_KEY) -> bool:
+        """Claim this cycle; the key expires just before the next one"""
+        client = self.connection.get()
+        if client is None:
+            return True
+        try:
+            return bool(client.set(key, self.token, nx=True, px=int(self.interval * 900)))
+        except Exception as e:
+            self.connection.mark_down(e)
+            return True
+
+    def poll_once(self) -> bool:
+        """Ingest the latest records; True when a new publication arrived"""
+        snapshots = latest_snapshots()
+        previous = (snapshots.peek("latest") or {}).get("value")
+        records = fetch_latest()
+        if not records:
+            return False
+        national = DATASETS["national"]
+        store = get_store()
+        store.upsert(national, [normalize(national, r) for r in records])
+        store.prune(national.name, config.REALTIME_RETENTION_DAYS)
+
+        if previous and publication_id(previous) == publication_id(records):
+            snapshots.store("latest", records)
+            return False
+        logger.info(f"New eco2mix data: {publication_id(records)}")
+        # Drop stale copies on every worker before publishing the new snapshot
+        snapshots.cache.invalidate()
+        snapshots.store("latest", records)
+        get_cache(ANALYTICS).invalidate()
+        get_cache(LLM_ANSWERS).invalidate()
+        try:
+            warm_feeds()
+        except Exception as e:
+            logger.warning(f"Dashboard feed warm-up failed: {e}")
+        return True
+
+    def poll_regions(self) -> int:
+        """Ingest all regional feeds (fetched concurrently); returns rows written"""
+        written = ingest_regions("regional")
+        get_store().prune("regional", config.REALTIME_RETENTION_DAYS)
+        return written
+
+    def ingest_store(self) -> int:
+        """Fill this host's region store from the shared tier; returns rows written"""
+        national = DATASETS["national"]
+        store = get_store()
+        written = store.upsert(national, [normalize(national, r) for r in get_latest_records(SNAPSHOT_LIMIT)])
+        store.prune(national.name, config.REALTIME_RETENTION_DAYS)
+        return written + self.poll_regions()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.is_leader():
+                try:
+                    self.poll_once()
+                except Exception as e:
+                    logger.warning(f"eco2mix poll failed: {e}")
+            if self.is_leader(STORE_LEADER_KEY):
+                try:
+                    self.ingest_store()
+                except Exception as e:
+                    logger.warning(f"Region store ingest failed: {e}")
+            self._stop.wait(self.interval)
@@ -0,0 +1,48 @@
+# app/registry.py
+import importlib
+import threading
+
+
+class ComponentRegistry:
+    """Lazily import and build optional components on first use.
+
+    Components are registered as "module:attribute" strings so registering
+    them costs nothing; the module is only imported when `get` is called.
+    """
+    def __init__(self):
+        self._targets = {}
+        self._instances = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, target: str):
+        """Register a component factory as 'package.module:Attribute'"""
+        self._targets[name] = target
+
+    def get(self, name: str):
+        """Return the shared instance, importing and building it on first call"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            if name not in self._instances:
+                if name not in self._targets:
+                    raise KeyError(f"Unknown component: {name}")
+                module_name, _, attribute = self._targets[name].partition(":")
+                factory = getattr(importlib.import_module(module_name), attribute)
+                self._instances[name] = factory()
+            return self._instances[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def loaded(self) -> list:
+        return sorted(self._instances)
+
+
+registry = ComponentRegistry()
+registry.register("data_analyst", "app.agents.data_analyst:DataAnalystAgent")
+registry.register("renewable_expert", "app.agents.renewable_expert:RenewableExpertAgent")
+registry.register("forecaster", "app.agents.forecaster:ForecasterAgent")
+registry.register("memory", "app.agents.redis_client:AgentMemory")
+registry.register("rag", "app.database.chroma_client:EnergyRAGSystem")
+registry.register("router", "app.workflows.router:QueryRouter")
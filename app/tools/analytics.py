@@ -0,0 +1,170 @@
+# app/tools/analytics.py
+"""Pure snapshot analytics behind /analyze (no I/O, cheap to benchmark)"""
+
+
+def safe_get(data, key, default=0):
+    """Safely get value from dict, handling None/null"""
+    value = data.get(key)
+    if value is None:
+        return default
+    try:
+        # Try to convert to float if it's a string number
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def extract_snapshot(latest: dict) -> dict:
+    """Extract data with safe handling of nulls"""
+    return {
+        "timestamp": latest.get('date', 'N/A'),
+        "production_MW": safe_get(latest, 'production'),
+        "consumption_MW": safe_get(latest, 'consommation'),
+        "nuclear_MW": safe_get(latest, 'nucleaire'),
+        "wind_MW": safe_get(latest, 'eolien'),
+        "solar_MW": safe_get(latest, 'solaire'),
+        "hydro_MW": safe_get(latest, 'hydraulique'),
+        "gas_MW": safe_get(latest, 'gaz'),
+        "carbon_intensity": safe_get(latest, 'taux_co2')
+    }
+
+
+def detect_intent(query: str) -> str:
+    """Simple keyword intent detection"""
+    query_lower = query.lower()
+
+    if "nuclear" in query_lower:
+        return "nuclear"
+    elif "wind" in query_lower:
+        return "wind"
+    elif "solar" in query_lower:
+        return "solar"
+    elif "renewable" in query_lower or "green" in query_lower:
+        return "renewable"
+    elif "mix" in query_lower:
+        return "mix"
+    elif "carbon" in query_lower or "co2" in query_lower:
+        return "carbon"
+    elif "consumption" in query_lower:
+        return "consumption"
+    return "overview"
+
+
+def analyze_snapshot(intent: str, data: dict) -> str:
+    """Build the analysis text for an intent from an extracted snapshot"""
+    production = data['production_MW']
+    consumption = data['consumption_MW']
+    nuclear = data['nuclear_MW']
+    wind = data['wind_MW']
+    solar = data['solar_MW']
+    hydro = data['hydro_MW']
+    gas = data['gas_MW']
+    carbon_intensity = data['carbon_intensity']
+
+    if intent == "nuclear":
+        total = production if production > 0 else 1  # Avoid division by zero
+        percent = (nuclear / total) * 100 if total > 0 else 0
+        analysis = f"Nuclear power provides {percent:.1f}% of France's electricity ({nuclear} MW out of {production} MW total)."
+
+    elif intent == "wind":
+        total = production if production > 0 else 1
+        percent = (wind / total) * 100 if total > 0 else 0
+        analysis = f"Wind power provides {percent:.1f}% of France's electricity ({wind} MW out of {production} MW total)."
+
+    elif intent == "solar":
+        total = production if production > 0 else 1
+        percent = (solar / total) * 100 if total > 0 else 0
+        analysis = f"Solar power provides {percent:.1f}% of France's electricity ({solar} MW out of {production} MW total)."
+
+    elif intent == "renewable":
+        renewables = wind + solar + hydro
+        total = production if production > 0 else 1
+        percent = (renewables / total) * 100 if total > 0 else 0
+        analysis = f"Renewables provide {percent:.1f}% of electricity: Wind: {wind} MW, Solar: {solar} MW, Hydro: {hydro} MW."
+
+    elif intent == "mix":
+        total = nuclear + wind + solar + hydro + gas
+        if total > 0:
+            analysis = f"Energy mix:\n"
+            analysis += f"- Nuclear: {(nuclear/total*100):.1f}% ({nuclear} MW)\n"
+            analysis += f"- Wind: {(wind/total*100):.1f}% ({wind} MW)\n"
+            analysis += f"- Solar: {(solar/total*100):.1f}% ({solar} MW)\n"
+            analysis += f"- Hydro: {(hydro/total*100):.1f}% ({hydro} MW)\n"
+            analysis += f"- Gas: {(gas/total*100):.1f}% ({gas} MW)\n"
+            analysis += f"Total: {total} MW"
+        else:
+            analysis = "No production data available."
+
+    elif intent == "carbon":
+        analysis = f"Carbon intensity: {carbon_intensity} gCO₂/kWh"
+        if carbon_intensity < 50:
+            analysis += " (Very low carbon)"
+        elif carbon_intensity < 100:
+            analysis += " (Low carbon)"
+        else:
+            analysis += " (Moderate carbon)"
+
+    elif intent == "consumption":
+        analysis = f"Consumption: {consumption} MW, Production: {production} MW"
+        balance = production - consumption
+        if balance > 0:
+            analysis += f" (Exporting {balance} MW)"
+        else:
+            analysis += f" (Importing {-balance} MW)"
+
+    else:
+        analysis = f"France's electricity: Production {production} MW, Consumption {consumption} MW. "
+        analysis += f"Nuclear: {nuclear} MW, Wind: {wind} MW, Solar: {solar} MW."
+
+    return analysis
+
+
+# Canonical store columns compared per intent in region queries
+REGION_INTENT_COLUMNS = {
+    "nuclear": ("nuclear",),
+    "wind": ("wind",),
+    "solar": ("solar",),
+    "renewable": ("wind", "solar", "hydro", "bioenergy"),
+    "consumption": ("consumption",),
+}
+REGION_MIX_COLUMNS = ("nuclear", "wind", "solar", "hydro", "thermal", "bioenergy")
+
+
+def region_snapshot(row: dict) -> dict:
+    """Store row -> the fields reported for a region"""
+    data = {"timestamp": row.get('ts', 'N/A')}
+    for column in ("consumption",) + REGION_MIX_COLUMNS:
+        data[f"{column}_MW"] = safe_get(row, column)
+    data["production_MW"] = sum(data[f"{c}_MW"] for c in REGION_MIX_COLUMNS)
+    return data
+
+
+def compare_regions(intent: str, regions: dict) -> str:
+    """Analysis text comparing regions ({name: region_snapshot(...)}) for an intent"""
+    if not regions:
+        return "No regional data available."
+
+    columns = REGION_INTENT_COLUMNS.get(intent)
+    if columns is None:
+        lines = []
+        for name, data in regions.items():
+            production = data['production_MW']
+            parts = ", ".join(f"{c.capitalize()}: {data[f'{c}_MW']:.0f} MW" for c in REGION_MIX_COLUMNS)
+            lines.append(f"- {name}: Production {production:.0f} MW, Consumption {data['consumption_MW']:.0f} MW ({parts})")
+        return "Regional electricity:\n" + "\n".join(lines)
+
+    label = "Renewables" if intent == "renewable" else intent.capitalize()
+    values = {name: sum(data[f"{c}_MW"] for c in columns) for name, data in regions.items()}
+    parts = []
+    for name, value in values.items():
+        production = regions[name]['production_MW']
+        if intent != "consumption" and production > 0:
+            parts.append(f"{name} {value:.0f} MW ({value / production * 100:.1f}% of its production)")
+        else:
+            parts.append(f"{name} {value:.0f} MW")
+    analysis = f"{label}: " + " vs ".join(parts) + "."
+
+    ranked = sorted(values.items(), key=lambda item: -item[1])
+    if len(ranked) > 1 and ranked[1][1] > 0:
+        analysis += f" {ranked[0][0]} leads with {ranked[0][1] / ranked[1][1]:.1f}x {ranked[1][0]}."
+    return analysis
@@ -1,26 +1,26 @@
 # app/tools/data_tools.py
-import requests
-import pandas as pd
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-from langchain_core.tools import tool
+from app.cache import ANALYTICS, get_cache
+from app.tools.eco2mix_client import MAX_LIMIT, Eco2mixClient
+from app.tools.snapshots import get_latest_records
 
 class Eco2mixDataTools:
     def __init__(self):
-        self.base_url = "https://odre.opendatasoft.com/api/explore/v2.1/catalog/datasets/eco2mix-national-tr/records"
+        self.client = Eco2mixClient()
+        self.base_url = self.client.base_url
         
-    @tool
     def get_real_time_data(self, limit: int = 10) -> str:
         """Fetch real-time energy data from France's grid"""
-        params = {
-            "limit": limit,
-            "order_by": "date desc",
-            "timezone": "UTC"
-        }
-        
         try:
-            response = requests.get(self.base_url, params=params)
-            data = response.json()
+            # Agents pass the tool input as text
+            limit = min(max(int(limit), 1), MAX_LIMIT)
+        except (TypeError, ValueError):
+            limit = 10
+
+        try:
+            # Served from the shared snapshot the poller keeps fresh, not per tool call
+            data = {"results": get_latest_records(limit=limit, timeout=10)}
             
             if 'results' in data and data['results']:
                 formatted = []
@@ -42,11 +42,16 @@ CO2 Intensity: {record.get('taux_co2', 0)} g/kWh
         except Exception as e:
             return f"Error fetching data: {str(e)}"
     
-    @tool
     def get_energy_mix(self, date: Optional[str] = None) -> str:
         """Get energy mix percentages for a specific date"""
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d")
+
+        # Shared across workers; invalidated by the poller when new data lands
+        cache = get_cache(ANALYTICS)
+        cached = cache.get(f"energy_mix:{date}")
+        if cached is not None:
+            return cached
             
         params = {
             "where": f"date >= '{date}T00:00:00' and date <= '{date}T23:59:59'",
@@ -54,10 +59,11 @@ CO2 Intensity: {record.get('taux_co2', 0)} g/kWh
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
-            data = response.json()
+            data = self.client.get_records(params, timeout=10)
             
             if 'results' in data and data['results']:
+                import pandas as pd
+
                 df = pd.DataFrame(data['results'])
                 mix_columns = ['nucleaire', 'eolien', 'solaire', 'hydraulique', 'gaz']
                 
@@ -74,6 +80,7 @@ CO2 Intensity: {record.get('taux_co2', 0)} g/kWh
                     result = f"Energy Mix for {date}:\n"
                     for source, percent in percentages.items():
                         result += f"- {source.title()}: {percent:.1f}%\n"
+                    cache.set(f"energy_mix:{date}", result)
                     return result
             return "No data available for the specified date"
         except Exception as e:
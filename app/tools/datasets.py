@@ -0,0 +1,148 @@
+# app/tools/datasets.py
+"""eco2mix dataset registry.
+
+Each ODRE dataset names its columns differently; a Dataset maps them onto
+one canonical schema (the columns of the region store) so national and
+regional, real-time and consolidated records can be queried the same way.
+"""
+import re
+import unicodedata
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+# Canonical columns, in MW except carbon_intensity (gCO2/kWh)
+COLUMNS = (
+    "consumption", "nuclear", "wind", "solar", "hydro", "gas", "coal", "oil",
+    "thermal", "bioenergy", "pumping", "exchanges", "carbon_intensity",
+)
+
+# Region key used for national datasets
+NATIONAL = "FR"
+
+# The 12 metropolitan regions published by eco2mix, by INSEE code
+REGIONS = {
+    "84": "Auvergne-Rhône-Alpes",
+    "27": "Bourgogne-Franche-Comté",
+    "53": "Bretagne",
+    "24": "Centre-Val de Loire",
+    "44": "Grand Est",
+    "32": "Hauts-de-France",
+    "11": "Île-de-France",
+    "28": "Normandie",
+    "75": "Nouvelle-Aquitaine",
+    "76": "Occitanie",
+    "52": "Pays de la Loire",
+    "93": "Provence-Alpes-Côte d'Azur",
+}
+
+# Unambiguous short names only: words like "centre", "nord" or "paris" also
+# appear in national questions and would route them to one region
+REGION_ALIASES = {
+    "auvergne": "84", "rhone alpes": "84",
+    "bourgogne": "27", "franche comte": "27", "bfc": "27",
+    "brittany": "53",
+    "alsace": "44", "lorraine": "44",
+    "hdf": "32",
+    "idf": "11",
+    "normandy": "28",
+    "paca": "93",
+}
+
+
+class Dataset(NamedTuple):
+    name: str
+    dataset_id: str
+    description: str
+    fields: dict                # canonical column -> source field
+    region_field: str = None    # None for national datasets
+    time_field: str = "date_heure"
+    history: str = None         # consolidated dataset covering the past, preferred where both exist
+
+    @property
+    def regional(self) -> bool:
+        return self.region_field is not None
+
+
+_NATIONAL_FIELDS = {
+    "consumption": "consommation", "nuclear": "nucleaire", "wind": "eolien",
+    "solar": "solaire", "hydro": "hydraulique", "gas": "gaz", "coal": "charbon",
+    "oil": "fioul", "bioenergy": "bioenergies", "pumping": "pompage",
+    "exchanges": "ech_physiques", "carbon_intensity": "taux_co2",
+}
+
+_REGIONAL_FIELDS = {
+    "consumption": "consommation", "nuclear": "nucleaire", "wind": "eolien",
+    "solar": "solaire", "hydro": "hydraulique", "thermal": "thermique",
+    "bioenergy": "bioenergies", "pumping": "pompage", "exchanges": "ech_physiques",
+}
+
+DATASETS = {d.name: d for d in (
+    Dataset("national", "eco2mix-national-tr", "France, real time", _NATIONAL_FIELDS,
+            history="national_consolidated"),
+    Dataset("national_consolidated", "eco2mix-national-cons-def",
+            "France, consolidated and definitive history", _NATIONAL_FIELDS),
+    Dataset("regional", "eco2mix-regional-tr", "Regions, real time",
+            _REGIONAL_FIELDS, region_field="code_insee_region", history="regional_consolidated"),
+    Dataset("regional_consolidated", "eco2mix-regional-cons-def",
+            "Regions, consolidated and definitive history",
+            _REGIONAL_FIELDS, region_field="code_insee_region"),
+)}
+
+
+def get_dataset(name: str) -> Dataset:
+    if name not in DATASETS:
+        raise KeyError(f"Unknown dataset: {name} (known: {', '.join(DATASETS)})")
+    return DATASETS[name]
+
+
+def record_time(dataset: Dataset, record: dict):
+    """UTC timestamp of a record as 'YYYY-MM-DDTHH:MM:SSZ', or None"""
+    value = record.get(dataset.time_field) or record.get('date')
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def normalize(dataset: Dataset, record: dict):
+    """Map a raw record onto the canonical columns (None if it has no timestamp)"""
+    ts = record_time(dataset, record)
+    if ts is None:
+        return None
+    region = str(record.get(dataset.region_field)) if dataset.regional else NATIONAL
+    row = {"region": region, "ts": ts}
+    for column, field in dataset.fields.items():
+        value = record.get(field)
+        row[column] = float(value) if isinstance(value, (int, float)) else None
+    return row
+
+
+def _fold(text: str) -> str:
+    """Lowercase, strip accents and punctuation for name matching"""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return " " + re.sub(r"[^a-z0-9]+", " ", text.lower()).strip() + " "
+
+
+_REGION_PATTERNS = sorted(
+    [(_fold(name), code) for code, name in REGIONS.items()]
+    + [(_fold(alias), code) for alias, code in REGION_ALIASES.items()],
+    key=lambda item: -len(item[0]),
+)
+
+
+def find_regions(text: str) -> list:
+    """Region codes mentioned in free text, in order of appearance"""
+    folded = _fold(text)
+    found = []
+    for pattern, code in _REGION_PATTERNS:
+        position = folded.find(pattern)
+        if position >= 0 and code not in (c for _, c in found):
+            found.append((position, code))
+            # Blank the match so a shorter alias inside it cannot match again
+            folded = folded[:position] + " " * len(pattern) + folded[position + len(pattern):]
+    return [code for _, code in sorted(found)]
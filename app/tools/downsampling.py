@@ -0,0 +1,73 @@
+# app/tools/downsampling.py
+"""Time-series downsampling for charts (pure functions, no I/O).
+
+Both take [(x, y, ...), ...] sorted by x with numeric x (e.g. epoch seconds)
+and keep the first and last points; extra tuple items are carried along.
+"""
+
+
+def lttb(points: list, threshold: int) -> list:
+    """Largest-Triangle-Three-Buckets: `threshold` points preserving the visual shape"""
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(p[0] for p in points[next_start:next_end]) / span
+        avg_y = sum(p[1] for p in points[next_start:next_end]) / span
+
+        # Point of this bucket forming the largest triangle with the last kept point
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        ax, ay = points[a][0], points[a][1]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            x, y = points[j][0], points[j][1]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def minmax(points: list, buckets: int) -> list:
+    """Min and max of each of `buckets` equal-count buckets (at most 2 * buckets points).
+
+    Keeps every peak and trough, which LTTB may smooth over.
+    """
+    n = len(points)
+    if buckets <= 0 or 2 * buckets >= n:
+        return list(points)
+
+    sampled = []
+    size = n / buckets
+    for i in range(buckets):
+        bucket = points[int(i * size):int((i + 1) * size)]
+        if not bucket:
+            continue
+        low = min(bucket, key=lambda p: p[1])
+        high = max(bucket, key=lambda p: p[1])
+        sampled.extend([low] if low is high else sorted((low, high), key=lambda p: p[0]))
+    if sampled[0] != points[0]:
+        sampled.insert(0, points[0])
+    if sampled[-1] != points[-1]:
+        sampled.append(points[-1])
+    return sampled
+
+
+DOWNSAMPLERS = {"lttb": lttb, "minmax": lambda points, n: minmax(points, max(1, n // 2))}
+
+
+def downsample(points: list, max_points: int, method: str = "lttb") -> list:
+    """Reduce to about `max_points` points with the named method"""
+    if method not in DOWNSAMPLERS:
+        raise ValueError(f"Unknown downsampling method: {method} (known: {', '.join(DOWNSAMPLERS)})")
+    return DOWNSAMPLERS[method](points, max_points)
@@ -0,0 +1,120 @@
+# app/tools/eco2mix_client.py
+import threading
+import time
+from collections import OrderedDict
+import requests
+from app import config
+from app.metrics import UPSTREAM_LATENCY
+from app.tools.datasets import DATASETS
+from app.tools.resilience import get_breaker, retry_with_jitter
+
+ECO2MIX_DATASET = DATASETS["national"].dataset_id
+
+# Largest page the ODRE records endpoint accepts
+MAX_LIMIT = 100
+
+
+def dataset_url(dataset: str = ECO2MIX_DATASET) -> str:
+    """Records endpoint for an eco2mix dataset"""
+    return f"{config.ECO2MIX_API_ROOT}/{dataset}/records"
+
+
+def export_url(dataset: str = ECO2MIX_DATASET) -> str:
+    """Bulk export endpoint (no page-size limit) for an eco2mix dataset"""
+    return f"{config.ECO2MIX_API_ROOT}/{dataset}/exports/json"
+
+
+class Eco2mixError(Exception):
+    """Raised when the eco2mix API returns a non-200 response"""
+    def __init__(self, status_code: int):
+        super().__init__(f"API returned status {status_code}")
+        self.status_code = status_code
+
+
+def is_transient(error: Exception) -> bool:
+    """Worth retrying: network errors, timeouts, 429 and 5xx"""
+    if isinstance(error, Eco2mixError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+class Eco2mixClient:
+    def __init__(self, base_url: str = None, dataset: str = ECO2MIX_DATASET, max_validators: int = 64):
+        self._base_url = base_url
+        self.dataset = dataset
+        self.max_validators = max_validators
+        # (url, params) -> (ETag, Last-Modified, payload) of the last 200 response
+        self._validators = OrderedDict()
+        self._lock = threading.Lock()
+        self.breaker = get_breaker(f"eco2mix:{dataset}")
+
+    @property
+    def base_url(self) -> str:
+        # Resolved per call so config changes (stubs, tests) take effect
+        return self._base_url or dataset_url(self.dataset)
+
+    def get_records(self, params: dict, timeout: float = 10, attempts: int = 2) -> dict:
+        """Fetch records through the circuit breaker, retrying transient errors.
+
+        Raises CircuitOpenError without calling eco2mix while the circuit is open.
+        Client errors (4xx other than 429) are raised without tripping the circuit.
+        """
+        return self.breaker.call(lambda: retry_with_jitter(
+            lambda: self._get_once(params, timeout), attempts=attempts, retry_if=is_transient
+        ), failure_if=is_transient)
+
+    def export_records(self, params: dict, timeout: float = 60, attempts: int = 2) -> list:
+        """All records matching `params` in one bulk export (for history backfills)"""
+        url = export_url(self.dataset)
+        return self.breaker.call(lambda: retry_with_jitter(
+            lambda: self._get_once(params, timeout, url=url, conditional=False),
+            attempts=attempts, retry_if=is_transient
+        ), failure_if=is_transient)
+
+    def _get_once(self, params: dict, timeout: float, url: str = None, conditional: bool = True):
+        """One eco2mix request, recording latency and status.
+
+        Repeated requests are sent conditionally; a 304 reuses the previous payload.
+        Bulk exports pass conditional=False so their payloads are not kept.
+        """
+        url = url or self.base_url
+        key = (url, tuple(sorted((k, str(v)) for k, v in params.items())))
+        with self._lock:
+            cached = self._validators.get(key) if conditional else None
+        headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = requests.get(url, params=params, headers=headers, timeout=timeout)
+            status = str(response.status_code)
+            if response.status_code == 304 and cached:
+                return cached[2]
+            if response.status_code != 200:
+                raise Eco2mixError(response.status_code)
+            payload = response.json()
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if conditional and (etag or last_modified):
+                with self._lock:
+                    self._validators[key] = (etag, last_modified, payload)
+                    self._validators.move_to_end(key)
+                    while len(self._validators) > self.max_validators:
+                        self._validators.popitem(last=False)
+            return payload
+        except requests.exceptions.Timeout:
+            status = "timeout"
+            raise
+        finally:
+            UPSTREAM_LATENCY.labels(dataset=self.dataset, status=status).observe(time.perf_counter() - start)
+
+    def get_latest(self, limit: int = 1, timeout: float = 10) -> list:
+        """Get the most recent records, newest quarter-hour first"""
+        data = self.get_records({"limit": limit, "order_by": "date_heure desc"}, timeout=timeout)
+        return data.get('results', [])
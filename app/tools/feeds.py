@@ -0,0 +1,115 @@
+# app/tools/feeds.py
+"""Server-side feeds for the dashboard: latest snapshot, energy mix and
+downsampled time series.
+
+Feeds are computed once per eco2mix publication and kept in the shared
+ANALYTICS cache (invalidated by the poller), so dashboard reruns cost a
+cache read instead of ODRE calls and client-side aggregation.
+"""
+from datetime import datetime, timedelta, timezone
+
+from app.cache import ANALYTICS, get_cache
+from app.tools.analytics import extract_snapshot
+from app.tools.datasets import COLUMNS, DATASETS, NATIONAL, REGIONS, get_dataset, normalize
+from app.tools.downsampling import DOWNSAMPLERS, downsample
+from app.tools.region_store import get_store
+from app.tools.regional import latest_by_region
+from app.tools.snapshots import SNAPSHOT_LIMIT, get_latest, latest_published, snapshot_id, snapshot_ttl
+
+MIX_SOURCES = ("nuclear", "wind", "solar", "hydro", "gas", "coal", "oil", "thermal", "bioenergy")
+MAX_POINTS = 10000
+MAX_DAYS = 3 * 366
+
+
+def latest_feed() -> tuple:
+    """(validator, payload) for the latest national snapshot"""
+    records, stale = get_latest(limit=SNAPSHOT_LIMIT)
+    record = latest_published(records)
+    snapshot = extract_snapshot(record)
+    snapshot["time"] = record.get('date_heure')
+    return snapshot_id(record), {"snapshot": snapshot, "stale": stale}
+
+
+def mix_shares(row: dict) -> dict:
+    """Share of each production source in a normalized row"""
+    sources = {s: row.get(s) or 0.0 for s in MIX_SOURCES if (row.get(s) or 0.0) > 0}
+    total = sum(sources.values())
+    return {
+        "time": row.get('ts'),
+        "total_MW": total,
+        "sources": [
+            {"source": source, "MW": value, "share": round(value / total * 100, 2)}
+            for source, value in sorted(sources.items(), key=lambda item: -item[1])
+        ],
+    }
+
+
+def mix_feed(region: str = NATIONAL) -> tuple:
+    """(validator, payload) for the latest production mix of France or a region"""
+    if region == NATIONAL:
+        records, stale = get_latest(limit=SNAPSHOT_LIMIT)
+        row = normalize(DATASETS["national"], latest_published(records)) or {}
+    else:
+        if region not in REGIONS:
+            raise ValueError(f"Unknown region: {region}")
+        row, stale = latest_by_region([region], max_age=snapshot_ttl()).get(region, {}), False
+    key = f"feed:mix:{region}:{row.get('ts')}"
+    mix = get_cache(ANALYTICS).get_or_set(key, lambda: mix_shares(row), ttl=snapshot_ttl())
+    return row.get('ts'), {"region": region, "mix": mix, "stale": stale}
+
+
+def _epoch(ts: str) -> float:
+    return datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp()
+
+
+def series_feed(column: str = "consumption", region: str = NATIONAL, days: float = 7,
+                points: int = 2000, method: str = "lttb") -> tuple:
+    """(validator, payload) for `days` of one column, downsampled to about `points` points.
+
+    Reads the real-time dataset and its consolidated history from the
+    region store; the consolidated row wins where both exist.
+    """
+    if column not in COLUMNS:
+        raise ValueError(f"Unknown column: {column}")
+    if region != NATIONAL and region not in REGIONS:
+        raise ValueError(f"Unknown region: {region}")
+    if method not in DOWNSAMPLERS:
+        raise ValueError(f"Unknown method: {method} (known: {', '.join(DOWNSAMPLERS)})")
+    if not 0 < days <= MAX_DAYS:
+        raise ValueError(f"days must be in (0, {MAX_DAYS}]")
+    points = max(10, min(points, MAX_POINTS))
+
+    dataset = get_dataset("national" if region == NATIONAL else "regional")
+    names = [dataset.history, dataset.name] if dataset.history else [dataset.name]
+    store = get_store()
+    # Newest filled-in value: the validators and cache key must change when a quarter-hour is filled
+    end = store.last_timestamp(names, region, column)
+    if end is None:
+        return None, {"column": column, "region": region, "method": method, "raw_count": 0, "count": 0, "points": []}
+    start = (datetime.fromisoformat(end.replace("Z", "+00:00")) - timedelta(days=days))
+    start = start.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def build():
+        rows = store.series(names, region, start, end, columns=(column,))
+        raw = [(_epoch(r['ts']), r[column], r['ts']) for r in rows if r[column] is not None]
+        sampled = downsample(raw, points, method)
+        return {
+            "column": column,
+            "region": region,
+            "method": method,
+            "start": start,
+            "end": end,
+            "raw_count": len(raw),
+            "count": len(sampled),
+            "points": [[ts, value] for _, value, ts in sampled],
+        }
+
+    key = f"feed:series:{region}:{column}:{days}:{points}:{method}:{end}"
+    return end, get_cache(ANALYTICS).get_or_set(key, build, ttl=snapshot_ttl())
+
+
+def warm_feeds():
+    """Precompute the dashboard's default feeds right after a new publication"""
+    mix_feed()
+    for days in (1, 7, 365):
+        series_feed("consumption", days=days)
@@ -0,0 +1,81 @@
+# app/tools/history.py
+"""Backfill the region store from the consolidated eco2mix datasets.
+
+The real-time feeds only cover recent days; dashboard history (up to a
+year) comes from the consolidated datasets, exported month by month with
+the months fetched concurrently:
+
+    python -m app.tools.history --dataset national_consolidated --days 365
+"""
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+from app.tools.datasets import REGIONS, Dataset, get_dataset, normalize
+from app.tools.region_store import get_store
+from app.tools.regional import FETCH_WORKERS, client_for
+
+logger = logging.getLogger(__name__)
+
+
+def month_ranges(start: date, end: date) -> list:
+    """[(first, last), ...] calendar-month chunks covering start..end"""
+    ranges = []
+    first = start
+    while first <= end:
+        next_month = (first.replace(day=1) + timedelta(days=32)).replace(day=1)
+        last = min(next_month - timedelta(days=1), end)
+        ranges.append((first, last))
+        first = next_month
+    return ranges
+
+
+def fetch_range(dataset: Dataset, first: date, last: date, region: str = None) -> list:
+    """All records of a dataset between two dates (inclusive), one bulk export"""
+    where = f"date >= '{first.isoformat()}' and date <= '{last.isoformat()}'"
+    if region:
+        where += f" and {dataset.region_field} = '{region}'"
+    return client_for(dataset).export_records({"where": where, "order_by": dataset.time_field})
+
+
+def backfill(dataset: str = "national_consolidated", days: int = 365, end: date = None,
+             regions=None, store=None) -> int:
+    """Load `days` of history up to `end` into the store; returns rows written"""
+    dataset = get_dataset(dataset)
+    store = store or get_store()
+    end = end or date.today()
+    regions = list(regions or REGIONS) if dataset.regional else [None]
+    chunks = [(first, last, region)
+              for first, last in month_ranges(end - timedelta(days=days - 1), end)
+              for region in regions]
+
+    written = 0
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(chunks)),
+                            thread_name_prefix="eco2mix-history") as pool:
+        futures = {pool.submit(fetch_range, dataset, *chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            first, last, region = futures[future]
+            try:
+                records = future.result()
+            except Exception as e:
+                logger.warning(f"{dataset.dataset_id} {first}..{last} {region or ''} failed: {e}")
+                continue
+            written += store.upsert(dataset, [normalize(dataset, r) for r in records])
+    logger.info(f"Backfilled {written} {dataset.name} rows")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill eco2mix history into the region store")
+    parser.add_argument("--dataset", default="national_consolidated")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--end", type=date.fromisoformat, help="last day (YYYY-MM-DD), default today")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    backfill(args.dataset, args.days, args.end)
+
+
+if __name__ == "__main__":
+    main()
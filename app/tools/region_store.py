@@ -0,0 +1,175 @@
+# app/tools/region_store.py
+"""Region-partitioned local store of normalized eco2mix records.
+
+Rows live in one SQLite table clustered on (dataset, region, ts), so each
+region's records are contiguous on disk: a region's latest values, or its
+time range, is a single index range read instead of an API call. Workers on the same host share the file (WAL).
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app import config
+from app.tools.datasets import COLUMNS, Dataset
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS records (
+    dataset TEXT NOT NULL,
+    region TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    {", ".join(f"{column} REAL" for column in COLUMNS)},
+    PRIMARY KEY (dataset, region, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ingests (
+    dataset TEXT NOT NULL,
+    region TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (dataset, region)
+) WITHOUT ROWID;
+"""
+
+
+class RegionStore:
+    def __init__(self, path: str = None):
+        self.path = path or config.REGION_STORE_PATH
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def upsert(self, dataset: Dataset, rows: list) -> int:
+        """Insert or replace normalized rows (see datasets.normalize) and note when each region was fetched"""
+        rows = [r for r in rows if r is not None]
+        if not rows:
+            return 0
+        names = ("dataset", "region", "ts") + COLUMNS
+        sql = f"INSERT OR REPLACE INTO records ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+        values = [(dataset.name, r["region"], r["ts"]) + tuple(r.get(c) for c in COLUMNS) for r in rows]
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(sql, values)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ingests (dataset, region, fetched_at) VALUES (?, ?, ?)",
+                [(dataset.name, region, now) for region in {r["region"] for r in rows}],
+            )
+        return len(rows)
+
+    def latest(self, dataset: str, regions=None) -> dict:
+        """region -> most recent row with data (plus its `fetched_at`), for all or the given regions.
+
+        One backward index read per region, so the cost does not grow with
+        the history kept.
+        """
+        sql = ("SELECT * FROM records WHERE dataset = ? AND region = ? AND consumption IS NOT NULL"
+               " ORDER BY ts DESC LIMIT 1")
+        with self._lock:
+            fetched = dict(self._conn.execute(
+                "SELECT region, fetched_at FROM ingests WHERE dataset = ?", (dataset,)
+            ).fetchall())
+            rows = {}
+            for region in regions or fetched:
+                row = self._conn.execute(sql, (dataset, region)).fetchone()
+                if row is not None:
+                    rows[region] = {**dict(row), "fetched_at": fetched.get(region)}
+        return rows
+
+    def prune(self, dataset: str, keep_days: float) -> int:
+        """Delete rows more than `keep_days` older than each region's newest row; returns rows deleted"""
+        with self._lock, self._conn:
+            newest = self._conn.execute(
+                "SELECT region, (SELECT MAX(ts) FROM records r WHERE r.dataset = i.dataset AND r.region = i.region)"
+                " FROM ingests i WHERE dataset = ?", (dataset,)
+            ).fetchall()
+            deleted = 0
+            for region, ts in newest:
+                if ts is None:
+                    continue
+                cutoff = datetime.fromisoformat(ts.replace("Z", "+00:00")) - timedelta(days=keep_days)
+                deleted += self._conn.execute(
+                    "DELETE FROM records WHERE dataset = ? AND region = ? AND ts < ?",
+                    (dataset, region, cutoff.strftime("%Y-%m-%dT%H:%M:%SZ")),
+                ).rowcount
+        return deleted
+
+    def series(self, dataset, region: str, start: str = None, end: str = None, columns=None) -> list:
+        """One region's rows in time order, optionally within [start, end].
+
+        `dataset` may be a list of names in order of preference: where several
+        have a row for the same timestamp, the first one wins. `columns`
+        limits the value columns read.
+        """
+        names = [dataset] if isinstance(dataset, str) else list(dataset)
+        if columns is None:
+            select = "*"
+        else:
+            unknown = set(columns) - set(COLUMNS)
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+            select = ", ".join(("dataset", "region", "ts") + tuple(columns))
+        sql = f"SELECT {select} FROM records WHERE dataset IN ({', '.join('?' * len(names))}) AND region = ?"
+        params = names + [region]
+        if start:
+            sql += " AND ts >= ?"
+            params.append(start)
+        if end:
+            sql += " AND ts <= ?"
+            params.append(end)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY ts", params).fetchall()
+        if len(names) == 1:
+            return [dict(row) for row in rows]
+
+        rank = {name: i for i, name in enumerate(names)}
+        merged = []
+        for row in rows:
+            if merged and merged[-1]["ts"] == row["ts"]:
+                if rank[row["dataset"]] < rank[merged[-1]["dataset"]]:
+                    merged[-1] = dict(row)
+                continue
+            merged.append(dict(row))
+        return merged
+
+    def last_timestamp(self, datasets, region: str, column: str = None):
+        """Newest ts of a region across one or more datasets, or None.
+
+        With `column`, the newest ts where that column has a value (eco2mix
+        lists quarter-hours before filling them).
+        """
+        names = [datasets] if isinstance(datasets, str) else list(datasets)
+        if column is None:
+            # One MAX per dataset so each is a single index lookup
+            part = "SELECT MAX(ts) AS ts FROM records WHERE dataset = ? AND region = ?"
+        elif column in COLUMNS:
+            # Newest first along the index, stopping at the first filled row
+            part = (f"SELECT * FROM (SELECT ts FROM records WHERE dataset = ? AND region = ?"
+                    f" AND {column} IS NOT NULL ORDER BY ts DESC LIMIT 1)")
+        else:
+            raise ValueError(f"Unknown column: {column}")
+        parts = " UNION ALL ".join([part] * len(names))
+        params = [p for name in names for p in (name, region)]
+        with self._lock:
+            return self._conn.execute(f"SELECT MAX(ts) FROM ({parts})", params).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> RegionStore:
+    """Shared store at REGION_STORE_PATH"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RegionStore()
+        return _store
@@ -0,0 +1,106 @@
+# app/tools/regional.py
+"""Concurrent ingestion of the regional eco2mix feeds into the region store.
+
+The store is a file per host, but fetches go through the shared cache tier:
+every host ingests the same records while eco2mix sees one call per region
+per snapshot across the cluster.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.tools.datasets import REGIONS, Dataset, get_dataset, normalize
+from app.tools.eco2mix_client import Eco2mixClient
+from app.tools.region_store import get_store
+from app.tools.snapshots import snapshot_cache, snapshot_ttl
+
+logger = logging.getLogger(__name__)
+
+# One day of quarter-hour records per region and poll cycle
+REGION_LIMIT = 96
+
+# All 12 regional feeds are fetched at once
+FETCH_WORKERS = 12
+
+_clients = {}
+_clients_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+
+def client_for(dataset: Dataset) -> Eco2mixClient:
+    """Shared client (and circuit breaker) per dataset"""
+    with _clients_lock:
+        if dataset.name not in _clients:
+            _clients[dataset.name] = Eco2mixClient(dataset=dataset.dataset_id)
+        return _clients[dataset.name]
+
+
+def fetch_region(dataset: Dataset, region: str, limit: int = REGION_LIMIT, timeout: float = 10) -> list:
+    """Latest records of one region, newest first"""
+    params = {
+        "where": f"{dataset.region_field} = '{region}'",
+        "order_by": f"{dataset.time_field} desc",
+        "limit": limit,
+    }
+    return client_for(dataset).get_records(params, timeout=timeout).get('results', [])
+
+
+def shared_region(dataset: Dataset, region: str, limit: int = REGION_LIMIT, timeout: float = 10) -> list:
+    """fetch_region through the shared cache; concurrent misses across the cluster wait on one Redis lock"""
+    return snapshot_cache().get_or_set(
+        f"region:{dataset.name}:{region}:{limit}",
+        lambda: fetch_region(dataset, region, limit, timeout),
+        ttl=snapshot_ttl(),
+    )
+
+
+def fetch_regions(dataset: str = "regional", regions=None, limit: int = REGION_LIMIT, timeout: float = 10) -> dict:
+    """region -> records, fetched concurrently; regions that fail are logged and left out"""
+    dataset = get_dataset(dataset)
+    regions = list(regions or REGIONS)
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(FETCH_WORKERS, len(regions))),
+                            thread_name_prefix="eco2mix-region") as pool:
+        futures = {region: pool.submit(shared_region, dataset, region, limit, timeout) for region in regions}
+        for region, future in futures.items():
+            try:
+                results[region] = future.result()
+            except Exception as e:
+                logger.warning(f"{dataset.dataset_id} fetch for {REGIONS.get(region, region)} failed: {e}")
+    return results
+
+
+def ingest_regions(dataset: str = "regional", regions=None, store=None) -> int:
+    """Fetch the regional feeds concurrently and upsert them; returns rows written"""
+    store = store or get_store()
+    fetched = fetch_regions(dataset, regions)
+    dataset = get_dataset(dataset)
+    return store.upsert(dataset, [normalize(dataset, r) for records in fetched.values() for r in records])
+
+
+def _needs_refresh(rows: dict, regions, max_age: float = None) -> list:
+    cutoff = time.time() - max_age if max_age else None
+    return [r for r in regions
+            if r not in rows or (cutoff and (rows[r]["fetched_at"] or 0) < cutoff)]
+
+
+def latest_by_region(regions, dataset: str = "regional", max_age: float = None, store=None) -> dict:
+    """region -> latest normalized row, in one store read.
+
+    Regions missing from the store, or last fetched more than `max_age`
+    seconds ago, are fetched (concurrently) first; the poller normally keeps
+    them fresh so this read does not touch eco2mix. Refreshes go through the
+    shared cache, so hosts refreshing the same region share one eco2mix call.
+    """
+    store = store or get_store()
+    rows = store.latest(dataset, regions)
+    if not _needs_refresh(rows, regions, max_age):
+        return rows
+    # One refresh at a time per process; requests queued behind it re-read what it stored
+    with _refresh_lock:
+        rows = store.latest(dataset, regions)
+        refresh = _needs_refresh(rows, regions, max_age)
+        if refresh and ingest_regions(dataset, refresh, store):
+            rows = store.latest(dataset, regions)
+    return rows
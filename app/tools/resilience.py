@@ -0,0 +1,189 @@
+# app/tools/resilience.py
+"""Circuit breaker, jittered retry and stale-while-revalidate for upstream calls"""
+import logging
+import random
+import threading
+import time
+
+from app.metrics import CIRCUIT_STATE
+
+logger = logging.getLogger(__name__)
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+_breakers = {}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that is known to be failing"""
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Fail fast after `failure_threshold` consecutive errors.
+
+    After `reset_timeout` one probe call is let through (half-open); its
+    outcome closes the circuit again or re-opens it.
+    """
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._probing = False
+        self._lock = threading.Lock()
+        self._set_state(CLOSED)
+
+    def _set_state(self, state: str):
+        self.state = state
+        CIRCUIT_STATE.labels(name=self.name).set(_STATE_VALUES[state])
+
+    def _before_call(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            retry_in = self.opened_at + self.reset_timeout - time.monotonic()
+            if self.state == OPEN and retry_in <= 0:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(self.name, max(retry_in, 0))
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self.last_error = None
+            if self.state != CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+            self._set_state(CLOSED)
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            self.last_error = str(error)
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f"Circuit {self.name} opened after {self.failures} failures: {error}")
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def release_probe(self):
+        """End a call whose error says nothing about upstream health"""
+        with self._lock:
+            self._probing = False
+
+    def call(self, fn, failure_if=lambda e: True):
+        """Call `fn` through the breaker; only errors matching `failure_if` count as failures"""
+        self._before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            if failure_if(e):
+                self.record_failure(e)
+            else:
+                self.release_probe()
+            raise
+        self.record_success()
+        return result
+
+    def status(self) -> dict:
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(self.opened_at + self.reset_timeout - time.monotonic(), 0), 1)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in_seconds": retry_in,
+            "last_error": self.last_error,
+        }
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Shared breaker per upstream, so every client of it trips together"""
+    if name not in _breakers:
+        _breakers.setdefault(name, CircuitBreaker(name, **kwargs))
+    return _breakers[name]
+
+
+def breaker_status() -> dict:
+    """State of every circuit breaker, for /health"""
+    return {name: breaker.status() for name, breaker in sorted(_breakers.items())}
+
+
+def retry_with_jitter(fn, attempts: int = 3, base_delay: float = 0.25, max_delay: float = 2.0,
+                      retry_if=lambda e: True):
+    """Call `fn`, retrying transient errors with full-jitter exponential backoff"""
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == attempts - 1 or not retry_if(e):
+                raise
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+
+
+class StaleWhileRevalidate:
+    """Serve the last good value at once and refresh it in the background.
+
+    Entries live in a TwoLevelCache for `stale_for` seconds; within
+    `fresh_for` they are served as-is, after that they are still served
+    (flagged stale) while one background refresh per key runs.
+    """
+    def __init__(self, cache, fresh_for: float, stale_for: float = 86400):
+        self.cache = cache
+        self.fresh_for = fresh_for
+        self.stale_for = stale_for
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def peek(self, key: str):
+        """Cached entry {"value", "fetched_at"} or None, without refreshing"""
+        return self.cache.get(key)
+
+    def store(self, key: str, value):
+        entry = {"value": value, "fetched_at": time.time()}
+        self.cache.set(key, entry, ttl=self.stale_for)
+        return entry
+
+    def get(self, key: str, loader):
+        """(value, age in seconds, stale flag)"""
+        entry = self.peek(key)
+        if entry is None:
+            # Nothing to serve yet: load in the foreground (single flight)
+            entry = self.cache.get_or_set(
+                key, lambda: {"value": loader(), "fetched_at": time.time()}, ttl=self.stale_for
+            )
+        age = max(time.time() - entry["fetched_at"], 0)
+        stale = age > self.fresh_for
+        if stale:
+            self._refresh_async(key, loader)
+        return entry["value"], age, stale
+
+    def _refresh_async(self, key: str, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.store(key, loader())
+            except CircuitOpenError as e:
+                logger.debug(f"Skipped refresh of {key}: {e}")
+            except Exception as e:
+                logger.warning(f"Background refresh of {key} failed, serving stale: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"swr-{key}", daemon=True).start()
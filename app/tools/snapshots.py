@@ -0,0 +1,93 @@
+# app/tools/snapshots.py
+import time
+from app import config
+from app.cache import SNAPSHOTS, get_cache
+from app.metrics import UPSTREAM_STALE_SERVED
+from app.tools.eco2mix_client import MAX_LIMIT, Eco2mixClient
+from app.tools.resilience import StaleWhileRevalidate
+
+# One day of quarter-hour records; every reader with a smaller limit shares this entry
+SNAPSHOT_LIMIT = 96
+
+# Keep the last good snapshot this long to ride out eco2mix outages
+STALE_FOR = 24 * 3600
+
+eco2mix = Eco2mixClient()
+_latest = None
+
+
+def snapshot_ttl() -> float:
+    """How long a snapshot counts as fresh: a bit longer than one poll cycle"""
+    return config.POLL_INTERVAL * 1.5 if config.POLL_INTERVAL > 0 else 300
+
+
+def snapshot_cache():
+    """Shared cache of raw eco2mix records (entries kept up to STALE_FOR)"""
+    return get_cache(SNAPSHOTS, ttl=STALE_FOR)
+
+
+def latest_snapshots() -> StaleWhileRevalidate:
+    """Shared stale-while-revalidate view of the latest eco2mix records"""
+    global _latest
+    if _latest is None:
+        _latest = StaleWhileRevalidate(snapshot_cache(), snapshot_ttl(), STALE_FOR)
+    return _latest
+
+
+def snapshot_id(record: dict) -> str:
+    """Identifies the eco2mix publication a record belongs to"""
+    return str(record.get('date_heure') or record.get('date') or "")
+
+
+def latest_published(records: list) -> dict:
+    """Newest record with values (eco2mix lists the next quarter-hours before filling them)"""
+    for record in records:
+        if record.get('consommation') is not None:
+            return record
+    return records[0] if records else {}
+
+
+def publication_id(records: list) -> str:
+    """Identifies the publication a list of latest records (newest first) comes from"""
+    return snapshot_id(latest_published(records))
+
+
+def fetch_latest(limit: int = SNAPSHOT_LIMIT, timeout: float = 10) -> list:
+    """Fetch the latest records straight from eco2mix"""
+    return eco2mix.get_latest(limit=limit, timeout=timeout)
+
+
+def get_latest(limit: int = 1, timeout: float = 10):
+    """(records, stale) through the shared cache.
+
+    A stale snapshot is returned immediately while it is refreshed in the
+    background; only a cold cache waits on eco2mix. `limit` must be within
+    1..MAX_LIMIT, as eco2mix would require.
+    """
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    key = "latest" if limit <= SNAPSHOT_LIMIT else f"latest:{limit}"
+    records, _, stale = latest_snapshots().get(key, lambda: fetch_latest(max(limit, SNAPSHOT_LIMIT), timeout))
+    if stale:
+        UPSTREAM_STALE_SERVED.labels(dataset=eco2mix.dataset).inc()
+    return records[:limit], stale
+
+
+def get_latest_records(limit: int = 1, timeout: float = 10) -> list:
+    """Latest records through the shared cache (one upstream call per cluster per refresh)"""
+    return get_latest(limit, timeout)[0]
+
+
+def snapshot_status() -> dict:
+    """Age of the cached snapshot, for /health (never calls eco2mix)"""
+    entry = latest_snapshots().peek("latest")
+    if entry is None:
+        return {"available": False}
+    age = max(time.time() - entry["fetched_at"], 0)
+    records = entry["value"]
+    return {
+        "available": True,
+        "snapshot": publication_id(records) or None,
+        "age_seconds": round(age, 1),
+        "stale": age > snapshot_ttl(),
+    }
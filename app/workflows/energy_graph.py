@@ -1,6 +1,12 @@
 # app/workflows/energy_graph.py
+import hashlib
 from typing import TypedDict
-from langgraph.graph import StateGraph, END
+from app.cache import LLM_ANSWERS, get_cache
+from app.metrics import WORKFLOW_NODE_LATENCY
+from app.registry import registry
+
+class _AgentFailed(Exception):
+    """Carries an agent's error answer past the cache"""
 
 # Define state
 class AgentState(TypedDict):
@@ -9,14 +15,10 @@ class AgentState(TypedDict):
     agent_used: str
 
 class EnergyWorkflow:
+    """Supervisor graph; agents are built on first use via the registry"""
     def __init__(self):
-        # Import agents here to avoid circular imports
-        from app.agents.data_analyst import DataAnalystAgent
-        from app.agents.renewable_expert import RenewableExpertAgent
-        
-        self.data_analyst = DataAnalystAgent()
-        self.renewable_expert = RenewableExpertAgent()
-        
+        from langgraph.graph import StateGraph, END
+
         # Build the graph
         workflow = StateGraph(AgentState)
         
@@ -44,36 +46,51 @@ class EnergyWorkflow:
         
         self.app = workflow.compile()
     
+    @WORKFLOW_NODE_LATENCY.labels(node="supervisor").time()
     def supervisor_node(self, state: AgentState):
         """Route query to appropriate agent"""
-        query = state['query'].lower()
-        
-        # Simple routing logic
-        if any(word in query for word in ['solar', 'wind', 'renewable', 'green', 'clean']):
-            return {"agent_used": "renewable_expert"}
-        else:
-            return {"agent_used": "data_analyst"}
+        decision = registry.get("router").route(state['query'])
+        return {"agent_used": decision.agent}
     
     def route_to_agent(self, state: AgentState):
         """Determine which agent to use"""
         return state['agent_used']
     
+    @WORKFLOW_NODE_LATENCY.labels(node="data_analyst").time()
     def data_analyst_node(self, state: AgentState):
         """Execute data analyst agent"""
-        result = self.data_analyst.analyze(state['query'])
+        result = self.ask_agent("data_analyst", state['query'])
         return {
             "result": result,
             "agent_used": "data_analyst"
         }
     
+    @WORKFLOW_NODE_LATENCY.labels(node="renewable_expert").time()
     def renewable_expert_node(self, state: AgentState):
         """Execute renewable expert agent"""
-        result = self.renewable_expert.analyze(state['query'])
+        result = self.ask_agent("renewable_expert", state['query'])
         return {
             "result": result,
             "agent_used": "renewable_expert"
         }
     
+    def ask_agent(self, agent: str, query: str) -> str:
+        """Agent answer, shared across workers until new eco2mix data arrives"""
+        key = hashlib.sha1(f"{agent}:{' '.join(query.lower().split())}".encode("utf-8")).hexdigest()
+
+        def load():
+            answer = registry.get(agent).analyze(query)
+            # Agents report failures as text; don't pin them in the cache
+            if answer.startswith("Error in analysis"):
+                raise _AgentFailed(answer)
+            return answer
+
+        try:
+            # Single flight: concurrent identical questions share one LLM call
+            return get_cache(LLM_ANSWERS).get_or_set(key, load, ttl=900)
+        except _AgentFailed as e:
+            return str(e)
+    
     def run(self, query: str):
         """Execute workflow with query"""
         initial_state = AgentState(
@@ -0,0 +1,289 @@
+# app/workflows/router.py
+"""Nearest-centroid query router shared by /analyze and the supervisor node.
+
+Each intent is represented by the mean embedding of a few labeled example
+queries. Centroids are cached on disk (keyed by embedding model and example
+set) and routing decisions are cached in memory, so a repeated query costs
+a dict lookup and a new one costs a single query embedding. Only
+low-confidence queries are escalated to the LLM; if embeddings are
+unavailable the keyword rules in app.tools.analytics are used.
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from app import config
+from app.metrics import ROUTE_LATENCY, record_cache
+from app.tools.analytics import detect_intent
+
+logger = logging.getLogger(__name__)
+
+# Labeled example queries per intent
+ROUTE_EXAMPLES = {
+    "nuclear": [
+        "How much nuclear power is France producing?",
+        "What share of electricity comes from nuclear reactors?",
+        "Why did nuclear production drop today?",
+        "Is the nuclear fleet running at full capacity?",
+        "How many MW are the nuclear plants generating?",
+        "EDF reactor output right now",
+    ],
+    "wind": [
+        "How much wind power is on the grid?",
+        "Is wind compensating for low hydro?",
+        "What is current wind generation?",
+        "How much are the wind turbines producing?",
+        "Offshore and onshore wind output",
+        "Is it a windy day for the grid?",
+    ],
+    "solar": [
+        "How much solar power is being produced?",
+        "What share of electricity comes from solar panels?",
+        "Photovoltaic output right now",
+        "How much sunshine is reaching the grid?",
+        "Solar generation today",
+        "Are the PV farms producing much?",
+    ],
+    "renewable": [
+        "How much renewable energy is being produced right now?",
+        "How green is the grid right now?",
+        "What share of clean energy is on the grid?",
+        "Are renewables covering demand?",
+        "Total output from wind, solar and hydro",
+        "How sustainable is France's electricity today?",
+    ],
+    "mix": [
+        "What is the current energy mix in France?",
+        "Break down electricity production by source",
+        "Which sources are generating power right now?",
+        "Show me the generation mix",
+        "How is production split between nuclear, gas and renewables?",
+        "What does the power mix look like?",
+    ],
+    "carbon": [
+        "What is the carbon intensity of the grid?",
+        "What's the carbon impact right now?",
+        "How many grams of CO2 per kWh?",
+        "How polluting is electricity today?",
+        "What are the grid's emissions?",
+        "Is the electricity low carbon right now?",
+    ],
+    "consumption": [
+        "How much electricity is France consuming?",
+        "What is the current demand on the grid?",
+        "Is consumption higher than production?",
+        "Is France importing or exporting power?",
+        "What is the load right now?",
+        "How much power are people using?",
+    ],
+    "overview": [
+        "Give me an overview of the grid",
+        "What is happening on France's grid right now?",
+        "Summarize the electricity situation",
+        "Status of the French power system",
+        "Tell me about France's electricity today",
+        "Quick grid update please",
+    ],
+}
+
+# Which workflow agent handles each intent
+INTENT_AGENTS = {
+    "nuclear": "data_analyst",
+    "wind": "renewable_expert",
+    "solar": "renewable_expert",
+    "renewable": "renewable_expert",
+    "mix": "data_analyst",
+    "carbon": "data_analyst",
+    "consumption": "data_analyst",
+    "overview": "data_analyst",
+}
+
+ROUTER_PROMPT = """Classify the question about France's electricity grid into exactly one category.
+Categories: {intents}
+Question: {query}
+Answer with the category name only."""
+
+
+class RouteDecision(NamedTuple):
+    intent: str
+    agent: str
+    confidence: float
+    source: str  # "centroid", "llm" or "keyword"
+
+
+def _normalize(vector: list) -> list:
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+
+class QueryRouter:
+    def __init__(self, embeddings=None, llm=None, embedding_model: str = "nomic-embed-text",
+                 cache_path: Optional[str] = None, min_confidence: float = 0.35,
+                 min_margin: float = 0.02, llm_fallback: bool = True, cache_size: int = 2048,
+                 examples: dict = None, retry_after: float = 30.0):
+        self._embeddings = embeddings
+        self._llm = llm
+        self.embedding_model = embedding_model
+        self.cache_path = cache_path if cache_path is not None else config.ROUTER_CACHE_PATH
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+        self.llm_fallback = llm_fallback
+        self.cache_size = cache_size
+        self.retry_after = retry_after
+        self.examples = examples or ROUTE_EXAMPLES
+        self.intents = list(self.examples)
+        self._centroids = None
+        self._embeddings_down_until = 0.0
+        self._decisions = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    # -- lazy dependencies ---------------------------------------------------
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            from app.llm_setup import LLMFactory
+            self._embeddings = LLMFactory().get_embeddings(self.embedding_model)
+        return self._embeddings
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            from app.llm_setup import LLMFactory
+            self._llm = LLMFactory().get_llm(temperature=0.0, agent="router")
+        return self._llm
+
+    # -- centroids -----------------------------------------------------------
+
+    def fingerprint(self) -> str:
+        """Identifies the embeddings backend, model and example set the centroids were built from"""
+        backend = getattr(self.embeddings, "base_url", None) or type(self.embeddings).__name__
+        payload = json.dumps([backend, self.embedding_model, self.examples], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _probe(self) -> list:
+        """Normalized embedding of the first example, to tell whether a centroid file matches this backend"""
+        return _normalize(self.embeddings.embed_query(self.examples[self.intents[0]][0]))
+
+    def centroids(self) -> dict:
+        """Intent centroids, loaded from disk or computed once"""
+        if self._centroids is None:
+            with self._build_lock:
+                if self._centroids is None:
+                    self._centroids = self._load_centroids() or self._build_centroids()
+        return self._centroids
+
+    def _load_centroids(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("fingerprint") != self.fingerprint():
+            return None
+        # Another server may answer for the same URL and model name: check one example
+        stored, probe = cached.get("probe") or [], self._probe()
+        if len(stored) != len(probe) or sum(a * b for a, b in zip(stored, probe)) < 0.99:
+            logger.warning(f"Ignoring {self.cache_path}: built from different embeddings")
+            return None
+        return cached["centroids"]
+
+    def _build_centroids(self) -> dict:
+        texts = [text for intent in self.intents for text in self.examples[intent]]
+        vectors = iter(self.embeddings.embed_documents(texts))
+        probe = self._probe()
+        centroids = {}
+        for intent in self.intents:
+            members = [_normalize(next(vectors)) for _ in self.examples[intent]]
+            mean = [sum(column) / len(members) for column in zip(*members)]
+            centroids[intent] = _normalize(mean)
+        if self.cache_path:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": self.fingerprint(), "probe": probe, "centroids": centroids}, f)
+            os.replace(tmp_path, self.cache_path)
+        return centroids
+
+    # -- routing -------------------------------------------------------------
+
+    def classify(self, query: str):
+        """(best intent, cosine similarity, margin over the runner-up)"""
+        vector = _normalize(self.embeddings.embed_query(query))
+        scores = sorted(
+            ((sum(a * b for a, b in zip(vector, centroid)), intent)
+             for intent, centroid in self.centroids().items()),
+            reverse=True
+        )
+        best_score, best_intent = scores[0]
+        margin = best_score - scores[1][0] if len(scores) > 1 else best_score
+        return best_intent, best_score, margin
+
+    def route(self, query: str) -> RouteDecision:
+        """Route a query to an intent and agent"""
+        start = time.perf_counter()
+        key = _normalize_query(query)
+        with self._lock:
+            decision = self._decisions.get(key)
+            if decision is not None:
+                self._decisions.move_to_end(key)
+        record_cache("router", decision is not None)
+        if decision is None:
+            decision = self._decide(query)
+            if decision.source != "keyword":
+                # Keyword fallbacks are not cached so routing recovers once embeddings are back
+                with self._lock:
+                    self._decisions[key] = decision
+                    if len(self._decisions) > self.cache_size:
+                        self._decisions.popitem(last=False)
+        ROUTE_LATENCY.labels(source=decision.source).observe(time.perf_counter() - start)
+        return decision
+
+    def _decide(self, query: str) -> RouteDecision:
+        if time.monotonic() < self._embeddings_down_until:
+            return self._decision(detect_intent(query), 0.0, "keyword")
+        try:
+            intent, confidence, margin = self.classify(query)
+        except Exception as e:
+            # Don't pay for a failing embedding call on every request
+            self._embeddings_down_until = time.monotonic() + self.retry_after
+            logger.warning(f"Embedding router unavailable, using keywords for {self.retry_after}s: {e}")
+            return self._decision(detect_intent(query), 0.0, "keyword")
+
+        if confidence >= self.min_confidence and margin >= self.min_margin:
+            return self._decision(intent, confidence, "centroid")
+
+        if self.llm_fallback:
+            llm_intent = self._ask_llm(query)
+            if llm_intent:
+                return self._decision(llm_intent, confidence, "llm")
+        return self._decision(intent, confidence, "centroid")
+
+    def _ask_llm(self, query: str) -> Optional[str]:
+        try:
+            answer = self.llm.invoke(ROUTER_PROMPT.format(intents=", ".join(self.intents), query=query))
+        except Exception as e:
+            logger.warning(f"LLM routing fallback failed: {e}")
+            return None
+        answer = str(answer).strip().lower()
+        for intent in self.intents:
+            if re.search(rf"\b{intent}\b", answer):
+                return intent
+        return None
+
+    def _decision(self, intent: str, confidence: float, source: str) -> RouteDecision:
+        return RouteDecision(intent, INTENT_AGENTS.get(intent, "data_analyst"), confidence, source)
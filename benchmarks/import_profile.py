@@ -0,0 +1,98 @@
+# benchmarks/import_profile.py
+"""Import-time profile of the API boot path.
+
+    python -m benchmarks.import_profile --max-seconds 1.5 --max-rss-mb 150
+
+Imports the app modules in a fresh interpreter with `-X importtime` and
+fails if boot time or peak RSS exceed the budget, or if a heavy ML /
+LangChain dependency is loaded before first use.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+# Must only be imported on first use (see app/registry.py)
+HEAVY_MODULES = (
+    "langchain", "langchain_core", "langchain_community", "langchain_ollama",
+    "langchain_text_splitters", "langgraph", "chromadb", "prophet", "pandas", "redis",
+)
+
+APP_MODULES = (
+    "app.main",
+    "app.registry",
+    "app.agents.data_analyst",
+    "app.agents.renewable_expert",
+    "app.agents.forecaster",
+    "app.agents.redis_client",
+    "app.database.chroma_client",
+    "app.tools.data_tools",
+    "app.workflows.energy_graph",
+)
+
+_PROBE = """
+import importlib, json, resource, sys
+for name in {modules!r}:
+    importlib.import_module(name)
+heavy = sorted({{m.split('.')[0] for m in sys.modules}} & set({heavy!r}))
+print(json.dumps({{"heavy_loaded": heavy,
+                  "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+
+def profile_imports(modules=APP_MODULES, top: int = 10) -> dict:
+    """Import `modules` in a fresh interpreter and report time, RSS and heavy modules"""
+    code = _PROBE.format(modules=tuple(modules), heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    cumulative = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if line.startswith("import time:") and len(parts) == 3 and parts[1].strip().isdigit():
+            cumulative.append((int(parts[1]), parts[2].strip()))
+    cumulative.sort(reverse=True)
+
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    report.update({
+        "name": "startup.import_app",
+        "wall_seconds": wall,
+        "slowest_imports_ms": [{"module": m, "cumulative_ms": us / 1000} for us, m in cumulative[:top]],
+    })
+    return report
+
+
+def check_budget(report: dict, max_seconds: float, max_rss_mb: float) -> list:
+    """Budget violations (empty when within budget)"""
+    problems = []
+    if report["heavy_loaded"]:
+        problems.append(f"heavy modules imported at startup: {', '.join(report['heavy_loaded'])}")
+    if report["wall_seconds"] > max_seconds:
+        problems.append(f"boot took {report['wall_seconds']:.2f}s (budget {max_seconds:.2f}s)")
+    if report["rss_mb"] > max_rss_mb:
+        problems.append(f"peak RSS {report['rss_mb']:.0f}MB (budget {max_rss_mb:.0f}MB)")
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time profile of the API boot path")
+    parser.add_argument("--max-seconds", type=float, default=1.5)
+    parser.add_argument("--max-rss-mb", type=float, default=150)
+    args = parser.parse_args(argv)
+
+    report = profile_imports()
+    print(f"boot {report['wall_seconds']:.2f}s, peak RSS {report['rss_mb']:.0f}MB")
+    for entry in report["slowest_imports_ms"]:
+        print(f"  {entry['cumulative_ms']:8.1f}ms  {entry['module']}")
+    problems = check_budget(report, args.max_seconds, args.max_rss_mb)
+    for problem in problems:
+        print(f"FAIL {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# benchmarks/load.py
+"""Closed-loop load generator for the API and the agent workflow"""
+import contextlib
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.micro import QUERIES, has_module
+from benchmarks.stats import summarize
+
+
+def generate_load(name: str, call, total: int = 500, concurrency: int = 8) -> dict:
+    """Run `call(i)` `total` times across `concurrency` threads"""
+    counter = itertools.count()
+    lock = threading.Lock()
+    samples, errors = [], [0]
+
+    def worker():
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            t0 = time.perf_counter()
+            try:
+                ok = call(i)
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - t0
+            with lock:
+                samples.append(elapsed)
+                if ok is False:
+                    errors[0] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall = time.perf_counter() - start
+    return summarize(name, samples, wall, errors=errors[0], concurrency=concurrency)
+
+
+@contextlib.contextmanager
+def serve_app(host: str = "127.0.0.1", port: int = 8765):
+    """Run app.main:app with uvicorn in a background thread"""
+    import uvicorn
+    from app.main import app
+
+    logging.getLogger("app.main").setLevel(logging.WARNING)
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("API server did not start")
+        time.sleep(0.05)
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+def run_load(total: int = 500, concurrency: int = 8) -> list:
+    import requests
+
+    results = []
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    with serve_app() as base_url:
+        def analyze(i):
+            response = session().post(f"{base_url}/analyze", json={"query": QUERIES[i % len(QUERIES)]}, timeout=30)
+            return response.status_code == 200 and response.json().get("status") == "success"
+
+        def data(i):
+            response = session().get(f"{base_url}/data", params={"limit": 3}, timeout=30)
+            return response.status_code == 200 and response.json().get("status") == "success"
+
+        def data_revalidate(i):
+            # What a polling client with a cached copy sends
+            response = session().get(f"{base_url}/data", params={"limit": 3},
+                                     headers={"If-None-Match": etag}, timeout=30)
+            return response.status_code == 304
+
+        results.append(generate_load("load.analyze", analyze, total, concurrency))
+        results.append(generate_load("load.data", data, total, concurrency))
+        # Taken once the snapshot is cached, so upstream errors cannot leave it unset
+        etag = session().get(f"{base_url}/data", params={"limit": 3}, timeout=30).headers.get("ETag")
+        results.append(generate_load("load.data_revalidate", data_revalidate, total, concurrency))
+
+    if has_module("langgraph") and has_module("langchain_ollama"):
+        from app.workflows.energy_graph import EnergyWorkflow
+        workflow = EnergyWorkflow()
+
+        def run_workflow(i):
+            return bool(workflow.run(QUERIES[i % len(QUERIES)]).get("result"))
+
+        results.append(generate_load("load.workflow", run_workflow, max(1, total // 10), concurrency))
+    return results
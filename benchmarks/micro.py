@@ -0,0 +1,188 @@
+# benchmarks/micro.py
+"""Microbenchmarks for analytics, ingestion and retrieval.
+
+App modules are imported inside each benchmark so the stub URLs set by the
+runner are picked up by app.config.
+"""
+import importlib.util
+import os
+import tempfile
+
+from benchmarks.stats import bench
+from benchmarks.stubs import load_fixture, synthetic_history
+
+QUERIES = [
+    "What is the current energy mix in France?",
+    "How much nuclear power is France producing?",
+    "Is wind compensating for low hydro?",
+    "How much solar is on the grid?",
+    "How green is the grid right now?",
+    "What is the carbon impact right now?",
+    "Is consumption higher than production?",
+    "Give me an overview",
+]
+
+POLICY_TEXT = (
+    "France's multiannual energy programme (PPE) sets targets for nuclear, wind and solar capacity. "
+    "Offshore wind tenders aim for 18 GW by 2035. Hydro remains the main flexible renewable source. "
+    "Carbon intensity of the French grid is among the lowest in Europe thanks to nuclear power. "
+)
+
+
+def has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def bench_analytics(iterations: int = 2000) -> list:
+    """Pure /analyze analytics over the recorded fixture"""
+    from app.tools.analytics import analyze_snapshot, detect_intent, extract_snapshot
+
+    records = load_fixture("eco2mix-national-tr")
+    state = {"i": 0}
+
+    def one():
+        i = state["i"] = state["i"] + 1
+        data = extract_snapshot(records[i % len(records)])
+        analyze_snapshot(detect_intent(QUERIES[i % len(QUERIES)]), data)
+
+    return [
+        bench("analytics.analyze_snapshot", one, iterations=iterations),
+        bench("analytics.extract_day", lambda: [extract_snapshot(r) for r in records], iterations=200),
+    ]
+
+
+def bench_ingestion(iterations: int = 50) -> list:
+    """eco2mix fetch + parse, and RAG document ingestion when chromadb is available"""
+    from app.tools.analytics import extract_snapshot
+    from app.tools.eco2mix_client import Eco2mixClient
+
+    client = Eco2mixClient()
+
+    def fetch_day():
+        data = client.get_records({"limit": 96, "order_by": "date_heure desc"})
+        return [extract_snapshot(r) for r in data["results"]]
+
+    results = [bench("ingestion.eco2mix_day", fetch_day, iterations=iterations, warmup=3)]
+
+    if has_module("pandas"):
+        from app.cache import ANALYTICS, get_cache
+        from app.tools.data_tools import Eco2mixDataTools
+        tools = Eco2mixDataTools()
+        cache = get_cache(ANALYTICS)
+
+        def energy_mix():
+            # Drop the cached result so each call fetches and aggregates the day
+            cache.invalidate()
+            return tools.get_energy_mix("2024-01-15")
+
+        results += [
+            bench("ingestion.energy_mix", energy_mix, iterations=iterations, warmup=3),
+            bench("ingestion.energy_mix_cached", lambda: tools.get_energy_mix("2024-01-15"),
+                  iterations=iterations, warmup=3),
+        ]
+
+    if has_module("chromadb") and has_module("langchain_community"):
+        results.append(bench("ingestion.rag_documents", lambda: _ingest_documents()[1],
+                             iterations=max(1, iterations // 10), warmup=1))
+    return results
+
+
+def _ingest_documents(n_docs: int = 5):
+    import chromadb
+    from app.database.chroma_client import EnergyRAGSystem
+
+    rag = EnergyRAGSystem(client=chromadb.EphemeralClient())
+    with tempfile.TemporaryDirectory() as docs_path:
+        for i in range(n_docs):
+            with open(os.path.join(docs_path, f"policy_{i}.txt"), "w", encoding="utf-8") as f:
+                f.write(POLICY_TEXT * 40)
+        return rag, rag.ingest_documents(docs_path)
+
+
+def bench_retrieval(iterations: int = 200) -> list:
+    """Query embedding and vector retrieval"""
+    results = []
+    if has_module("langchain_ollama"):
+        from app.llm_setup import LLMFactory
+        embeddings = LLMFactory().get_embeddings()
+        results.append(bench("retrieval.embed_query", lambda: embeddings.embed_query(QUERIES[0]),
+                             iterations=iterations))
+    if has_module("chromadb") and has_module("langchain_community"):
+        rag, _ = _ingest_documents()
+        state = {"i": 0}
+
+        def query():
+            state["i"] += 1
+            rag.query_documents(QUERIES[state["i"] % len(QUERIES)])
+
+        results.append(bench("retrieval.query_documents", query, iterations=iterations))
+    return results
+
+
+def bench_routing(iterations: int = 500) -> list:
+    """Embedding router: uncached decisions (one query embedding) and cached ones"""
+    if not has_module("langchain_ollama"):
+        return []
+    from app.workflows.router import QueryRouter
+
+    router = QueryRouter(cache_path=os.path.join(tempfile.mkdtemp(), "centroids.json"), llm_fallback=False)
+    router.centroids()
+    state = {"i": 0}
+
+    def uncached():
+        state["i"] += 1
+        router.route(f"{QUERIES[state['i'] % len(QUERIES)]} #{state['i']}")
+
+    return [
+        bench("routing.route_uncached", uncached, iterations=iterations),
+        bench("routing.route_cached", lambda: router.route(QUERIES[0]), iterations=iterations * 10),
+    ]
+
+
+def bench_regions(iterations: int = 20) -> list:
+    """Regional feeds: concurrent vs sequential ingestion, store read vs per-region API calls"""
+    from app.tools.datasets import REGIONS, get_dataset
+    from app.tools.region_store import RegionStore
+    from app.tools.regional import fetch_region, ingest_regions
+
+    store = RegionStore(os.path.join(tempfile.mkdtemp(), "regions.sqlite3"))
+    dataset = get_dataset("regional")
+    compared = ["32", "76"]  # Hauts-de-France vs Occitanie
+    ingest_regions(store=store)
+
+    return [
+        bench("regions.ingest_concurrent", lambda: ingest_regions(store=store), iterations=iterations),
+        bench("regions.ingest_sequential", lambda: [fetch_region(dataset, r) for r in REGIONS],
+              iterations=iterations),
+        bench("regions.compare_store_read", lambda: store.latest("regional", compared), iterations=iterations * 100),
+        bench("regions.compare_api_calls", lambda: [fetch_region(dataset, r, limit=1) for r in compared],
+              iterations=iterations),
+    ]
+
+
+def bench_feeds(iterations: int = 20) -> list:
+    """Dashboard series feed: read one year of history and downsample it to 2000 points"""
+    from app.tools.datasets import get_dataset, normalize
+    from app.tools.downsampling import downsample
+    from app.tools.feeds import _epoch
+    from app.tools.region_store import RegionStore
+
+    store = RegionStore(os.path.join(tempfile.mkdtemp(), "history.sqlite3"))
+    dataset = get_dataset("national_consolidated")
+    store.upsert(dataset, [normalize(dataset, r) for r in synthetic_history(365)])
+    names = ["national_consolidated", "national"]
+
+    def read():
+        return store.series(names, "FR", columns=("consumption",))
+
+    raw = [(_epoch(r['ts']), r['consumption'], r['ts']) for r in read()]
+    return [
+        bench("feeds.series_read_1y", read, iterations=iterations, warmup=2),
+        bench("feeds.lttb_1y", lambda: downsample(raw, 2000, "lttb"), iterations=iterations, warmup=2),
+        bench("feeds.minmax_1y", lambda: downsample(raw, 2000, "minmax"), iterations=iterations, warmup=2),
+    ]
+
+
+def run_micro() -> list:
+    return (bench_analytics() + bench_ingestion() + bench_regions() + bench_feeds()
+            + bench_retrieval() + bench_routing())
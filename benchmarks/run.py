@@ -0,0 +1,118 @@
+# benchmarks/run.py
+"""Offline benchmark runner.
+
+    python -m benchmarks.run --suite all --output bench_results.json
+    python -m benchmarks.run --suite micro --baseline bench_results.json
+    python -m benchmarks.run --suite startup
+
+Starts local eco2mix and Ollama stubs, points the app at them and writes
+machine-readable results (JSON) for regression tracking.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from benchmarks.stubs import Eco2mixStub, OllamaStub
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: list, baseline_path: str, max_regression: float) -> list:
+    """Names whose p95 regressed by more than `max_regression` vs the baseline"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["name"])
+        if previous and previous["p95_ms"] > 0:
+            change = result["p95_ms"] / previous["p95_ms"] - 1
+            if change > max_regression:
+                regressions.append(f"{result['name']}: p95 {previous['p95_ms']:.2f}ms -> "
+                                   f"{result['p95_ms']:.2f}ms (+{change:.0%})")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Energy AI offline benchmarks")
+    parser.add_argument("--suite", choices=["micro", "load", "startup", "all"], default="all")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--requests", type=int, default=500, help="requests per load target")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--eco2mix-latency-ms", type=float, default=20.0)
+    parser.add_argument("--eco2mix-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--eco2mix-error-rate", type=float, default=0.0)
+    parser.add_argument("--ollama-latency-ms", type=float, default=50.0)
+    parser.add_argument("--baseline", help="previous results file to compare p95 against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    startup = None
+    if args.suite in ("startup", "all"):
+        # Runs in a fresh interpreter, before the stubs or app modules are loaded here
+        from benchmarks.import_profile import profile_imports
+        startup = profile_imports()
+
+    with Eco2mixStub(latency_ms=args.eco2mix_latency_ms, jitter_ms=args.eco2mix_jitter_ms,
+                     error_rate=args.eco2mix_error_rate) as eco2mix, \
+            OllamaStub(generate_latency_ms=args.ollama_latency_ms) as ollama, \
+            tempfile.TemporaryDirectory(prefix="energy-bench-") as state_dir:
+        # Must be set before any app module is imported
+        os.environ["ECO2MIX_API_ROOT"] = eco2mix.api_root
+        os.environ["OLLAMA_BASE_URL"] = ollama.url
+        # Stub centroids and fixture rows must not land in the real .cache/
+        os.environ["ROUTER_CACHE_PATH"] = os.path.join(state_dir, "router_centroids.json")
+        os.environ["REGION_STORE_PATH"] = os.path.join(state_dir, "eco2mix.sqlite3")
+
+        results = []
+        if args.suite in ("micro", "all"):
+            from benchmarks.micro import run_micro
+            results += run_micro()
+        if args.suite in ("load", "all"):
+            from benchmarks.load import run_load
+            results += run_load(total=args.requests, concurrency=args.concurrency)
+        upstream = {"eco2mix_requests": eco2mix.requests_served, "ollama_requests": ollama.requests_served}
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "upstream": upstream,
+        "startup": startup,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for r in results:
+        print(f"{r['name']:<32} n={r['count']:<5} err={r['errors']:<3} "
+              f"p50={r['p50_ms']:8.2f}ms p95={r['p95_ms']:8.2f}ms p99={r['p99_ms']:8.2f}ms "
+              f"{r['throughput_per_s']:9.1f}/s")
+    print(f"upstream calls: {upstream}")
+    if startup:
+        print(f"startup: {startup['wall_seconds']:.2f}s, peak RSS {startup['rss_mb']:.0f}MB, "
+              f"heavy modules: {startup['heavy_loaded'] or 'none'}")
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
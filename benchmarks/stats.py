@@ -0,0 +1,45 @@
+# benchmarks/stats.py
+import math
+import statistics
+import time
+
+
+def percentile(sorted_samples: list, q: float) -> float:
+    """Nearest-rank percentile of pre-sorted samples"""
+    if not sorted_samples:
+        return 0.0
+    index = max(0, math.ceil(q / 100 * len(sorted_samples)) - 1)
+    return sorted_samples[index]
+
+
+def summarize(name: str, samples: list, wall_seconds: float = None, errors: int = 0, **extra) -> dict:
+    """Latency summary in milliseconds (samples are in seconds)"""
+    ordered = sorted(samples)
+    wall = wall_seconds if wall_seconds is not None else sum(samples)
+    result = {
+        "name": name,
+        "count": len(samples),
+        "errors": errors,
+        "mean_ms": statistics.fmean(ordered) * 1000 if ordered else 0.0,
+        "min_ms": ordered[0] * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        "throughput_per_s": len(samples) / wall if wall > 0 else 0.0,
+    }
+    result.update(extra)
+    return result
+
+
+def bench(name: str, fn, iterations: int = 200, warmup: int = 10, **extra) -> dict:
+    """Time `fn()` sequentially"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(name, samples, time.perf_counter() - start, **extra)
@@ -0,0 +1,338 @@
+# benchmarks/stubs.py
+"""Local stand-ins for the ODRE eco2mix API and Ollama.
+
+Both servers run in a background thread on an ephemeral port so benchmarks
+and tests never touch the network:
+
+    with Eco2mixStub(latency_ms=50) as eco2mix, OllamaStub() as ollama:
+        os.environ["ECO2MIX_API_ROOT"] = eco2mix.api_root
+        os.environ["OLLAMA_BASE_URL"] = ollama.url
+"""
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+API_PREFIX = "/api/explore/v2.1/catalog/datasets"
+EMBEDDING_DIM = 768
+
+
+def load_fixture(dataset: str) -> list:
+    """Load recorded records for a dataset (newest first)"""
+    with open(os.path.join(FIXTURES_DIR, f"{dataset}.json"), encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def record_fixture(dataset: str = "eco2mix-national-tr", limit: int = 96):
+    """Refresh a fixture from the live ODRE API (needs network)"""
+    import requests
+    url = f"https://odre.opendatasoft.com{API_PREFIX}/{dataset}/records"
+    response = requests.get(url, params={"limit": limit, "order_by": "date_heure desc"}, timeout=30)
+    response.raise_for_status()
+    path = os.path.join(FIXTURES_DIR, f"{dataset}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(response.json(), f, ensure_ascii=False, indent=1)
+    return path
+
+
+class _StubServer:
+    """Threaded HTTP server lifecycle shared by the stubs"""
+    handler_class = None
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests_served += 1
+
+    def start(self):
+        stub = self
+
+        class Handler(self.handler_class):
+            server_stub = stub
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_stub = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload, status: int = 200, content_type: str = "application/json", headers=None):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+
+# --- eco2mix ---------------------------------------------------------------
+
+_WHERE_RANGE = re.compile(r"(\w+)\s*(>=|<=|>|<|=)\s*'([^']*)'")
+
+
+def _apply_where(records: list, where: str) -> list:
+    """Support the simple `field op 'value' and ...` filters the app sends"""
+    for field, op, value in _WHERE_RANGE.findall(where or ""):
+        def keep(record, field=field, op=op, value=value):
+            current = str(record.get(field) or "")
+            # Compare dates on the shorter of the two strings so `date <= 'YYYY-MM-DDT23:59:59'` works
+            if field.startswith("date"):
+                size = min(len(current), len(value))
+                current, value = current[:size], value[:size]
+            return {
+                ">=": current >= value, "<=": current <= value,
+                ">": current > value, "<": current < value, "=": current == value,
+            }[op]
+        records = [r for r in records if keep(r)]
+    return records
+
+
+def synthetic_history(days: int = 365, end: str = "2024-01-15", step_minutes: int = 15, seed: int = 0) -> list:
+    """Deterministic consolidated-style national records (oldest first) with daily and seasonal cycles"""
+    rng = random.Random(seed)
+    stop = datetime.fromisoformat(f"{end}T23:45:00")
+    steps = days * 24 * 60 // step_minutes
+    records = []
+    for i in range(steps, 0, -1):
+        at = stop - timedelta(minutes=step_minutes * (i - 1))
+        season = math.cos(2 * math.pi * (at.timetuple().tm_yday - 15) / 365)
+        hour = at.hour + at.minute / 60
+        daily = math.sin(2 * math.pi * (hour - 7) / 24)
+        consumption = 52000 + 14000 * season + 6000 * daily + rng.gauss(0, 800)
+        solar = max(0.0, 9000 * (1 - 0.6 * season) * math.sin(math.pi * (hour - 6) / 14)) if 6 < hour < 20 else 0.0
+        wind = max(300.0, 7000 + 4000 * math.sin(i / 500) + rng.gauss(0, 600))
+        nuclear = 40000 + 8000 * season + rng.gauss(0, 500)
+        hydro = max(1000.0, 7000 + 3000 * daily + rng.gauss(0, 400))
+        gas = max(0.0, consumption - nuclear - wind - solar - hydro + 2000)
+        records.append({
+            "perimetre": "France", "nature": "Données consolidées",
+            "date": at.strftime("%Y-%m-%d"), "heure": at.strftime("%H:%M"),
+            "date_heure": at.strftime("%Y-%m-%dT%H:%M:00+01:00"),
+            "consommation": round(consumption), "nucleaire": round(nuclear), "eolien": round(wind),
+            "solaire": round(solar), "hydraulique": round(hydro), "gaz": round(gas),
+            "charbon": 0, "fioul": 100, "bioenergies": 1000, "pompage": 0,
+            "ech_physiques": round(consumption - nuclear - wind - solar - hydro - gas - 1100),
+            "taux_co2": round(20 + gas / 400),
+        })
+    return records
+
+
+def _select(stub, dataset: str, query: dict) -> list:
+    records = _apply_where(stub.datasets[dataset], query.get("where"))
+    order_by = query.get("order_by", "")
+    if order_by:
+        field, _, direction = order_by.partition(" ")
+        records = sorted(records, key=lambda r: str(r.get(field) or ""),
+                         reverse=direction.strip().lower() == "desc")
+    return records
+
+
+class _Eco2mixHandler(_JSONHandler):
+    def do_GET(self):
+        stub = self.server_stub
+        stub.count_request()
+        parsed = urlparse(self.path)
+        match = re.fullmatch(API_PREFIX + r"/([\w-]+)/(records|exports/json)", parsed.path)
+        if not match or match.group(1) not in stub.datasets:
+            self.send_json({"error_code": "NotFound"}, status=404)
+            return
+
+        stub.simulate_latency()
+        if stub.error_rate and stub.random.random() < stub.error_rate:
+            self.send_json({"error_code": "ServiceUnavailable"}, status=503)
+            return
+
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        records = _select(stub, match.group(1), query)
+        if match.group(2) == "exports/json":
+            self.send_json(records)
+            return
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", 10))
+        body = json.dumps({"total_count": len(records), "results": records[offset:offset + limit]}).encode("utf-8")
+
+        # Validators like ODRE's, so clients can revalidate with a 304
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        headers = {"ETag": etag, "Last-Modified": stub.last_modified}
+        if self.headers.get("If-None-Match") == etag:
+            stub.count_not_modified()
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_json(body, headers=headers)
+
+
+class Eco2mixStub(_StubServer):
+    """Serves recorded eco2mix fixtures (and `history_days` of synthetic consolidated data)
+    with configurable latency and error rate"""
+    handler_class = _Eco2mixHandler
+
+    def __init__(self, datasets=("eco2mix-national-tr", "eco2mix-regional-tr"), latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0, history_days: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.datasets = {name: load_fixture(name) for name in datasets}
+        if history_days:
+            self.datasets["eco2mix-national-cons-def"] = synthetic_history(history_days, seed=seed)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self.not_modified_served = 0
+
+    def count_not_modified(self):
+        with self._lock:
+            self.not_modified_served += 1
+
+    @property
+    def api_root(self) -> str:
+        """Value for ECO2MIX_API_ROOT"""
+        return self.url + API_PREFIX
+
+    def simulate_latency(self):
+        delay = self.latency_ms + (self.random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+
+# --- Ollama ----------------------------------------------------------------
+
+def deterministic_embedding(text: str, dim: int = EMBEDDING_DIM) -> list:
+    """Hashed bag-of-words embedding: stable, and texts sharing words stay close"""
+    vector = [0.0] * dim
+    for token in re.findall(r"\w+", text.lower()):
+        digest = hashlib.md5(token.encode("utf-8")).digest()
+        index = int.from_bytes(digest[:4], "little") % dim
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def deterministic_completion(prompt: str) -> str:
+    """ReAct-compatible answer derived from the prompt"""
+    digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+    return f"Thought: I now know the final answer\nFinal Answer: Stub answer {digest}"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class _OllamaHandler(_JSONHandler):
+    def do_GET(self):
+        self.server_stub.count_request()
+        if self.path == "/api/tags":
+            self.send_json({"models": [{"name": name, "model": name} for name in self.server_stub.models]})
+        elif self.path == "/api/version":
+            self.send_json({"version": "0.0.0-stub"})
+        else:
+            self.send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        stub = self.server_stub
+        stub.count_request()
+        body = self.read_json()
+        model = body.get("model", "stub")
+        if self.path in ("/api/embed", "/api/embeddings"):
+            stub.simulate_latency(stub.embed_latency_ms)
+            if self.path == "/api/embed":
+                inputs = body.get("input", [])
+                inputs = [inputs] if isinstance(inputs, str) else inputs
+                self.send_json({"model": model, "embeddings": [deterministic_embedding(t) for t in inputs]})
+            else:
+                self.send_json({"embedding": deterministic_embedding(body.get("prompt", ""))})
+        elif self.path in ("/api/generate", "/api/chat"):
+            stub.simulate_latency(stub.generate_latency_ms)
+            if self.path == "/api/chat":
+                prompt = "\n".join(m.get("content", "") for m in body.get("messages", []))
+            else:
+                prompt = body.get("prompt", "")
+            text = deterministic_completion(prompt)
+            final = {
+                "model": model, "created_at": _now(), "done": True, "done_reason": "stop",
+                "prompt_eval_count": len(prompt.split()), "eval_count": len(text.split()),
+                "total_duration": 0, "eval_duration": 0,
+            }
+            if self.path == "/api/chat":
+                chunk = {"model": model, "created_at": _now(), "done": False,
+                         "message": {"role": "assistant", "content": text}}
+                final["message"] = {"role": "assistant", "content": ""}
+            else:
+                chunk = {"model": model, "created_at": _now(), "done": False, "response": text}
+                final["response"] = ""
+            if body.get("stream", True):
+                payload = (json.dumps(chunk) + "\n" + json.dumps(final) + "\n").encode("utf-8")
+                self.send_json(payload, content_type="application/x-ndjson")
+            else:
+                final.update({k: v for k, v in chunk.items() if k in ("response", "message")})
+                self.send_json(final)
+        elif self.path == "/api/show":
+            self.send_json({"modelfile": "", "parameters": "", "template": "", "details": {}})
+        else:
+            self.send_json({"error": "not found"}, status=404)
+
+
+class OllamaStub(_StubServer):
+    """Deterministic Ollama completions and embeddings"""
+    handler_class = _OllamaHandler
+
+    def __init__(self, generate_latency_ms: float = 0.0, embed_latency_ms: float = 0.0,
+                 models=("llama3.1:8b", "nomic-embed-text"), **kwargs):
+        super().__init__(**kwargs)
+        self.generate_latency_ms = generate_latency_ms
+        self.embed_latency_ms = embed_latency_ms
+        self.models = list(models)
+
+    def simulate_latency(self, latency_ms: float):
+        if latency_ms > 0:
+            time.sleep(latency_ms / 1000)
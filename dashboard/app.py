@@ -1,8 +1,7 @@
-# dashboard/app.py - UPDATED WITH NULL HANDLING
+# dashboard/app.py - SERVED FROM API FEEDS
 import streamlit as st
 import requests
 import plotly.graph_objects as go
-import json
 
 st.set_page_config(page_title="France Energy AI", layout="wide")
 st.title("🇫🇷 France Energy AI Dashboard")
@@ -11,6 +10,20 @@ st.markdown("Real-time analysis of France's energy grid")
 # Sidebar
 st.sidebar.header("Settings")
 api_url = st.sidebar.text_input("API URL", "http://localhost:8001")
+if st.sidebar.button("🔄 Refresh data"):
+    st.cache_data.clear()
+
+RANGES = {"1 day": 1, "7 days": 7, "30 days": 30, "1 year": 365}
+SERIES = {
+    "Consumption": "consumption",
+    "Nuclear": "nuclear",
+    "Wind": "wind",
+    "Solar": "solar",
+    "Hydro": "hydro",
+    "Gas": "gas",
+}
+# About one point per horizontal pixel of the chart
+CHART_POINTS = 2000
 
 # Helper function to format numbers safely
 def format_number(value):
@@ -22,145 +35,127 @@ def format_number(value):
     except (ValueError, TypeError):
         return "0"
 
+# Feeds are aggregated by the API; cache them here so reruns skip the network
+@st.cache_data(ttl=60, show_spinner=False)
+def get_feed(api_url, path, **params):
+    response = requests.get(f"{api_url}{path}", params=params, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_series(api_url, column, region, days, method):
+    return get_feed(api_url, "/feeds/series", column=column, region=region,
+                    days=days, points=CHART_POINTS, method=method)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_region_names(api_url):
+    body = get_feed(api_url, "/regions")
+    return {"FR": "France", **{r["code"]: r["region"] for r in body.get("data", [])}}
+
+@st.cache_data(ttl=300, show_spinner=False)
+def analyze(api_url, query):
+    response = requests.post(f"{api_url}/analyze", json={"query": query}, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+def show_error(e):
+    if isinstance(e, requests.exceptions.Timeout):
+        st.error("Request timed out. Please try again.")
+    elif isinstance(e, requests.exceptions.ConnectionError):
+        st.error("Cannot connect to API. Make sure the server is running.")
+    else:
+        st.error(f"Error: {str(e)}")
+
+# Latest snapshot
+try:
+    latest = get_feed(api_url, "/feeds/latest")
+    if latest.get("status") == "success":
+        data = latest["snapshot"]
+        cols = st.columns(6)
+        cols[0].metric("🔌 Consumption", f"{format_number(data.get('consumption_MW'))} MW")
+        cols[1].metric("☢️ Nuclear", f"{format_number(data.get('nuclear_MW'))} MW")
+        cols[2].metric("🌬️ Wind", f"{format_number(data.get('wind_MW'))} MW")
+        cols[3].metric("🌞 Solar", f"{format_number(data.get('solar_MW'))} MW")
+        cols[4].metric("🌊 Hydro", f"{format_number(data.get('hydro_MW'))} MW")
+        cols[5].metric("🌍 CO2", f"{format_number(data.get('carbon_intensity'))} g/kWh")
+        caption = f"Updated: {data.get('time') or data.get('timestamp', 'N/A')}"
+        if latest.get("stale"):
+            caption += " (eco2mix unavailable, showing last known data)"
+        st.caption(caption)
+    else:
+        st.error(f"Error: {latest.get('message', 'Unknown error')}")
+except Exception as e:
+    show_error(e)
+
 # Main content
 col1, col2 = st.columns([3, 1])
 
 with col1:
+    st.subheader("History")
+    try:
+        region_names = get_region_names(api_url)
+    except Exception:
+        region_names = {"FR": "France"}
+    controls = st.columns(4)
+    series_label = controls[0].selectbox("Series", list(SERIES))
+    range_label = controls[1].radio("Range", list(RANGES), index=1, horizontal=True)
+    region = controls[2].selectbox("Area", list(region_names), format_func=region_names.get)
+    method = controls[3].selectbox("Downsampling", ["lttb", "minmax"])
+
+    try:
+        series = get_series(api_url, SERIES[series_label], region, RANGES[range_label], method)
+        if series.get("status") == "success" and series.get("points"):
+            times, values = zip(*series["points"])
+            fig = go.Figure(data=[go.Scattergl(x=times, y=values, mode="lines", name=series_label)])
+            fig.update_layout(height=380, margin=dict(l=10, r=10, t=10, b=10), yaxis_title="MW")
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"{series['count']:,} of {series['raw_count']:,} points ({series['method']})")
+        elif series.get("status") == "success":
+            st.info("No history stored yet. Run python -m app.tools.history to backfill.")
+        else:
+            st.error(f"Error: {series.get('message', 'Unknown error')}")
+    except Exception as e:
+        show_error(e)
+
     query = st.text_input(
         "Ask about France's energy:",
         "What is the current energy mix in France?"
     )
-    
+
     if st.button("Analyze", type="primary"):
         with st.spinner("Analyzing..."):
             try:
-                response = requests.post(
-                    f"{api_url}/analyze",
-                    json={"query": query},
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    if result.get("status") == "success":
-                        st.success("✅ Analysis Complete")
-                        
-                        # Show analysis
-                        st.subheader("Analysis")
-                        st.write(result.get("analysis", "No analysis available"))
-                        
-                        # Show data with safe formatting
-                        with st.expander("📊 View Data"):
-                            if "data" in result:
-                                data = result["data"]
-                                
-                                # Create metrics with safe formatting
-                                col1, col2, col3 = st.columns(3)
-                                
-                                with col1:
-                                    st.metric("⚡ Production", f"{format_number(data.get('production_MW'))} MW")
-                                    st.metric("🔌 Consumption", f"{format_number(data.get('consumption_MW'))} MW")
-                                    st.metric("☢️ Nuclear", f"{format_number(data.get('nuclear_MW'))} MW")
-                                
-                                with col2:
-                                    st.metric("🌬️ Wind", f"{format_number(data.get('wind_MW'))} MW")
-                                    st.metric("🌞 Solar", f"{format_number(data.get('solar_MW'))} MW")
-                                    st.metric("🌊 Hydro", f"{format_number(data.get('hydro_MW'))} MW")
-                                
-                                with col3:
-                                    st.metric("🏭 Gas", f"{format_number(data.get('gas_MW'))} MW")
-                                    st.metric("🌍 CO2", f"{format_number(data.get('carbon_intensity'))} g/kWh")
-                                    st.metric("🕐 Updated", data.get('timestamp', 'N/A'))
-                                
-                                # Create pie chart only if we have positive values
-                                production = float(format_number(data.get('production_MW')).replace(',', ''))
-                                if production > 0:
-                                    st.subheader("Energy Mix")
-                                    
-                                    # Get values safely
-                                    mix_data = {}
-                                    sources = [
-                                        ("Nuclear", data.get('nuclear_MW')),
-                                        ("Wind", data.get('wind_MW')),
-                                        ("Solar", data.get('solar_MW')),
-                                        ("Hydro", data.get('hydro_MW')),
-                                        ("Gas", data.get('gas_MW'))
-                                    ]
-                                    
-                                    for name, value in sources:
-                                        try:
-                                            val = float(value) if value is not None else 0
-                                            if val > 0:
-                                                mix_data[name] = val
-                                        except (ValueError, TypeError):
-                                            continue
-                                    
-                                    if mix_data:
-                                        fig = go.Figure(data=[go.Pie(
-                                            labels=list(mix_data.keys()),
-                                            values=list(mix_data.values()),
-                                            hole=0.3,
-                                            textinfo='label+percent'
-                                        )])
-                                        st.plotly_chart(fig)
-                                    else:
-                                        st.info("No positive production data available for pie chart.")
-                    else:
-                        st.error(f"Error: {result.get('message', 'Unknown error')}")
+                result = analyze(api_url, query)
+
+                if result.get("status") == "success":
+                    st.success("✅ Analysis Complete")
+                    st.subheader("Analysis")
+                    st.write(result.get("analysis", "No analysis available"))
                 else:
-                    st.error(f"API Error: {response.status_code}")
-                    
-            except requests.exceptions.Timeout:
-                st.error("Request timed out. Please try again.")
-            except requests.exceptions.ConnectionError:
-                st.error("Cannot connect to API. Make sure the server is running.")
+                    st.error(f"Error: {result.get('message', 'Unknown error')}")
             except Exception as e:
-                st.error(f"Error: {str(e)}")
+                show_error(e)
 
 with col2:
-    st.subheader("Quick Actions")
-    
-    if st.button("🔄 Get Latest Data"):
-        try:
-            response = requests.get(
-                "https://odre.opendatasoft.com/api/explore/v2.1/catalog/datasets/eco2mix-national-tr/records",
-                params={"limit": 1, "order_by": "date desc"},
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get('results'):
-                    latest = data['results'][0]
-                    
-                    # Safely extract values
-                    def get_safe(key, default=0):
-                        val = latest.get(key)
-                        return val if val is not None else default
-                    
-                    # Display metrics with safe formatting
-                    st.metric("⚡ Production", f"{format_number(get_safe('production'))} MW")
-                    st.metric("🔌 Consumption", f"{format_number(get_safe('consommation'))} MW")
-                    st.metric("☢️ Nuclear", f"{format_number(get_safe('nucleaire'))} MW")
-                    st.metric("🌬️ Wind", f"{format_number(get_safe('eolien'))} MW")
-                    st.metric("🌞 Solar", f"{format_number(get_safe('solaire'))} MW")
-                    st.metric("🌊 Hydro", f"{format_number(get_safe('hydraulique'))} MW")
-                    st.metric("🏭 Gas", f"{format_number(get_safe('gaz'))} MW")
-                    st.metric("🌍 CO2", f"{format_number(get_safe('taux_co2'))} g/kWh")
-                    
-                    st.caption(f"Updated: {latest.get('date', 'N/A')}")
-                else:
-                    st.error("No data in response")
-            else:
-                st.error(f"API Error: {response.status_code}")
-                
-        except requests.exceptions.Timeout:
-            st.error("Request timed out")
-        except Exception as e:
-            st.error(f"Failed to fetch: {str(e)}")
-    
+    st.subheader("Energy Mix")
+    try:
+        mix = get_feed(api_url, "/feeds/mix", region=region)
+        sources = mix.get("mix", {}).get("sources", []) if mix.get("status") == "success" else []
+        if sources:
+            fig = go.Figure(data=[go.Pie(
+                labels=[s["source"].capitalize() for s in sources],
+                values=[s["MW"] for s in sources],
+                hole=0.3,
+                textinfo='label+percent'
+            )])
+            fig.update_layout(height=320, margin=dict(l=0, r=0, t=0, b=0), showlegend=False)
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"{region_names.get(region, region)}, total {format_number(mix['mix']['total_MW'])} MW")
+        else:
+            st.info("No positive production data available for pie chart.")
+    except Exception as e:
+        show_error(e)
+
     # Test connection
     st.subheader("Connection Status")
     if st.button("Test Connection"):
@@ -177,7 +172,7 @@ with col2:
                 st.error(f"❌ API Error: {response.status_code}")
         except:
             st.error("❌ Cannot connect to API")
-    
+
     st.divider()
     st.info("Data from: RTE eco2mix API")
 
@@ -185,8 +180,8 @@ with col2:
 st.sidebar.divider()
 st.sidebar.info("""
 ### Troubleshooting
-If you see null values:
-1. The API might be temporarily unavailable
-2. Try the "Get Latest Data" button
-3. Check the console for errors
-""")
\ No newline at end of file
+If charts are empty:
+1. Make sure the API is running
+2. Backfill history with python -m app.tools.history
+3. Press "Refresh data" to clear the dashboard cache
+""")
@@ -0,0 +1,36 @@
+# tests/conftest.py
+import pytest
+
+from app import config
+from benchmarks.stubs import Eco2mixStub, OllamaStub
+
+
+@pytest.fixture(scope="session")
+def eco2mix_stub():
+    with Eco2mixStub() as stub:
+        yield stub
+
+
+@pytest.fixture(scope="session")
+def ollama_stub():
+    with OllamaStub() as stub:
+        yield stub
+
+
+@pytest.fixture
+def offline(monkeypatch, tmp_path, eco2mix_stub, ollama_stub):
+    """Point the app at the local eco2mix and Ollama stubs.
+
+    Router centroids and the region store go to tmp_path, so stub
+    embeddings and fixture rows never reach the real .cache/ files.
+    """
+    from app.tools import region_store
+
+    monkeypatch.setattr(config, "ECO2MIX_API_ROOT", eco2mix_stub.api_root)
+    monkeypatch.setattr(config, "OLLAMA_BASE_URL", ollama_stub.url)
+    monkeypatch.setattr(config, "ROUTER_CACHE_PATH", str(tmp_path / "router_centroids.json"))
+    monkeypatch.setattr(config, "REGION_STORE_PATH", str(tmp_path / "eco2mix.sqlite3"))
+    store = region_store.RegionStore()
+    monkeypatch.setattr(region_store, "_store", store)
+    yield eco2mix_stub, ollama_stub
+    store.close()
@@ -1,7 +1,5 @@
-# Test script - test_agents.py
-from app.workflows.energy_graph import EnergyWorkflow
-
-workflow = EnergyWorkflow()
+# tests/test_agents.py
+import pytest
 
 # Test queries
 test_queries = [
@@ -10,8 +8,26 @@ test_queries = [
     "What's the carbon intensity of France's grid today?"
 ]
 
-for query in test_queries:
-    print(f"\n{'='*50}")
-    print(f"Query: {query}")
+
+@pytest.mark.parametrize("query", test_queries)
+def test_workflow_answers_offline(offline, query):
+    from app.workflows.energy_graph import EnergyWorkflow
+
+    workflow = EnergyWorkflow()
     result = workflow.run(query)
-    print(f"Result: {result['analysis_results']}")
\ No newline at end of file
+
+    assert result['agent_used'] in ("data_analyst", "renewable_expert")
+    assert result['result'].startswith("Stub answer")
+
+
+def test_real_time_tool_reads_the_shared_snapshot(offline):
+    from app.tools.data_tools import Eco2mixDataTools
+
+    eco2mix_stub, _ = offline
+    tools = Eco2mixDataTools()
+    first = tools.get_real_time_data("5")
+    served = eco2mix_stub.requests_served
+
+    assert "Record 1:" in first
+    assert tools.get_real_time_data() == first
+    assert eco2mix_stub.requests_served == served
@@ -0,0 +1,138 @@
+# tests/test_api.py
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(offline):
+    from app.main import app
+    return TestClient(app)
+
+
+def test_analyze_uses_latest_record(client):
+    response = client.post("/analyze", json={"query": "How much nuclear power?"})
+    body = response.json()
+
+    assert body['status'] == "success"
+    assert body['analysis'].startswith("Nuclear power provides")
+    assert body['data']['timestamp'] == "2024-01-15"
+
+
+def test_data_returns_limit_records_without_nulls(client):
+    body = client.get("/data", params={"limit": 3}).json()
+
+    assert body['count'] == 3
+    assert all(value is not None for record in body['data'] for value in record.values())
+
+
+@pytest.mark.parametrize("limit", [-1, 0, 101])
+def test_data_rejects_out_of_range_limit(client, limit):
+    body = client.get("/data", params={"limit": limit}).json()
+
+    assert body['status'] == "error"
+    assert "between 1 and 100" in body['message']
+
+
+def test_metrics_exposes_request_latency(client):
+    client.get("/")
+    assert "energy_api_request_seconds" in client.get("/metrics").text
+
+
+def test_data_revalidates_with_304(client):
+    first = client.get("/data", params={"limit": 3})
+    etag = first.headers["etag"]
+
+    again = client.get("/data", params={"limit": 3}, headers={"If-None-Match": etag})
+    since = client.get("/data", params={"limit": 3},
+                       headers={"If-Modified-Since": first.headers["last-modified"]})
+
+    assert again.status_code == 304 and again.content == b""
+    assert since.status_code == 304
+
+
+@pytest.fixture
+def filling_stub(monkeypatch):
+    """A private stub whose newest quarter-hour is listed but not yet filled in"""
+    from app import config
+    from app.tools.snapshots import latest_snapshots
+    from benchmarks.stubs import Eco2mixStub
+
+    with Eco2mixStub() as stub:
+        monkeypatch.setattr(config, "ECO2MIX_API_ROOT", stub.api_root)
+        newest = max(stub.datasets["eco2mix-national-tr"], key=lambda r: r["date_heure"])
+        consumption, newest["consommation"] = newest["consommation"], None
+        latest_snapshots().cache.invalidate()
+
+        def fill():
+            newest["consommation"] = consumption
+            # What the poller does when it sees the new publication
+            latest_snapshots().cache.invalidate()
+
+        yield fill
+    latest_snapshots().cache.invalidate()
+
+
+@pytest.mark.parametrize("method, path, kwargs", [
+    ("get", "/data", {"params": {"limit": 1}}),
+    ("post", "/analyze", {"json": {"query": "How much nuclear power?"}}),
+])
+def test_filled_in_row_changes_validators(filling_stub, method, path, kwargs):
+    from app.main import app
+    client = TestClient(app)
+
+    first = getattr(client, method)(path, **kwargs)
+    filling_stub()
+    again = getattr(client, method)(path, headers={"If-None-Match": first.headers["etag"]}, **kwargs)
+
+    assert again.status_code == 200
+    assert again.headers["etag"] != first.headers["etag"]
+    if path == "/data":
+        assert first.json()['data'][0]['consommation'] == 0
+        assert again.json()['data'][0]['consommation'] == 52719
+
+
+def test_analyze_etag_depends_on_query(client):
+    nuclear = client.post("/analyze", json={"query": "How much nuclear power?"})
+    wind = client.post("/analyze", json={"query": "How much wind power?"},
+                       headers={"If-None-Match": nuclear.headers["etag"]})
+
+    assert wind.status_code == 200
+    assert wind.headers["etag"] != nuclear.headers["etag"]
+
+
+def test_large_bodies_are_compressed(client):
+    response = client.get("/data", params={"limit": 20}, headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()['count'] == 20
+
+
+def test_upstream_requests_are_conditional(offline):
+    from app.tools.eco2mix_client import Eco2mixClient
+
+    eco2mix_stub, _ = offline
+    client = Eco2mixClient()
+    before = eco2mix_stub.not_modified_served
+    first = client.get_records({"limit": 5})
+    second = client.get_records({"limit": 5})
+
+    assert second == first
+    assert eco2mix_stub.not_modified_served == before + 1
+
+
+def test_metrics_aggregate_across_worker_processes(tmp_path):
+    import os
+    import subprocess
+    import sys
+
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = "from app.metrics import record_cache; record_cache('test', hit=True)"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+    scrape = "from app.metrics import render_metrics; print(render_metrics()[0].decode())"
+    text = subprocess.run([sys.executable, "-c", scrape], env=env, check=True,
+                          capture_output=True, text=True).stdout
+
+    assert 'energy_cache_requests_total{cache="test",result="hit"} 2.0' in text
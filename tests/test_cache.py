@@ -0,0 +1,102 @@
+# tests/test_cache.py
+import threading
+import time
+
+import pytest
+
+from app.cache import RedisConnection, TwoLevelCache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def worker_cache(server, **kwargs):
+    """A cache as seen by one worker process: own L1, shared Redis"""
+    connection = RedisConnection(client=fakeredis.FakeRedis(server=server))
+    return TwoLevelCache("test", ttl=60, local_ttl=60, connection=connection, **kwargs)
+
+
+def test_value_set_by_one_worker_is_read_by_another(server):
+    worker_cache(server).set("latest", {"date": "2024-01-15"})
+
+    assert worker_cache(server).get("latest") == {"date": "2024-01-15"}
+
+
+def test_single_flight_across_workers(server):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return [1, 2, 3]
+
+    workers = [worker_cache(server, wait_interval=0.01) for _ in range(4)]
+    results = []
+    threads = [threading.Thread(target=lambda c=c: results.append(c.get_or_set("latest", loader)))
+               for c in workers for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [[1, 2, 3]] * 12
+
+
+def test_invalidate_drops_entries_on_every_worker(server):
+    first, second = worker_cache(server), worker_cache(server)
+    first.set("analyze:nuclear", "old")
+    assert second.get("analyze:nuclear") == "old"
+
+    first.invalidate()
+    # What the pub/sub listener does on the other workers
+    second.apply_invalidation(first.generation)
+
+    assert first.get("analyze:nuclear") is None
+    assert second.get("analyze:nuclear") is None
+
+
+def test_resync_recovers_a_missed_invalidation(server):
+    first, second = worker_cache(server), worker_cache(server)
+    first.set("latest", "old")
+    assert second.get("latest") == "old"
+
+    # The invalidation message never reaches the second worker
+    first.invalidate()
+    first.set("latest", "new")
+    second.resync()
+
+    assert second.get("latest") == "new"
+
+
+def test_degrades_to_local_cache_without_redis():
+    connection = RedisConnection(url="redis://127.0.0.1:1/0")
+    cache = TwoLevelCache("test", ttl=60, connection=connection)
+    calls = []
+
+    assert cache.get_or_set("k", lambda: calls.append(1) or "v") == "v"
+    assert cache.get_or_set("k", lambda: calls.append(1) or "v") == "v"
+    assert len(calls) == 1
+
+
+def test_get_cache_rejects_conflicting_ttl():
+    from app.cache import get_cache
+
+    cache = get_cache("test-ttl", ttl=900)
+
+    assert get_cache("test-ttl") is cache and cache.ttl == 900
+    with pytest.raises(ValueError):
+        get_cache("test-ttl", ttl=60)
+
+
+def test_entry_ttl_overrides_namespace_default():
+    connection = RedisConnection(url="redis://127.0.0.1:1/0")
+    cache = TwoLevelCache("test", ttl=60, local_ttl=60, connection=connection)
+    cache.get_or_set("short", lambda: "v", ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.get("short") is None
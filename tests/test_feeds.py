@@ -0,0 +1,141 @@
+# tests/test_feeds.py
+import math
+from datetime import date
+
+import pytest
+import requests
+
+from app import config
+from app.tools import feeds, region_store
+from app.tools.downsampling import lttb, minmax
+from app.tools.region_store import RegionStore
+from benchmarks.stubs import Eco2mixStub
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="module")
+def history_store(tmp_path_factory):
+    """A year of consolidated national history, backfilled once from the stub"""
+    from app.tools.history import backfill
+
+    store = RegionStore(str(tmp_path_factory.mktemp("history") / "eco2mix.sqlite3"))
+    with Eco2mixStub(history_days=365) as stub, pytest.MonkeyPatch.context() as patch:
+        patch.setattr(config, "ECO2MIX_API_ROOT", stub.api_root)
+        backfill("national_consolidated", days=365, end=date(2024, 1, 15), store=store)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def client(offline, history_store, monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(region_store, "_store", history_store)
+    return TestClient(app)
+
+
+def wave(n):
+    return [(float(i), math.sin(i / 50) + (5 if i == n // 3 else 0)) for i in range(n)]
+
+
+def test_lttb_keeps_endpoints_and_size():
+    points = wave(10000)
+    sampled = lttb(points, 500)
+
+    assert len(sampled) == 500
+    assert sampled[0] == points[0] and sampled[-1] == points[-1]
+    assert max(p[1] for p in sampled) == max(p[1] for p in points)  # the spike survives
+
+
+def test_minmax_keeps_extremes():
+    points = wave(10000)
+    sampled = minmax(points, 250)
+
+    assert len(sampled) <= 502
+    assert min(p[1] for p in sampled) == min(p[1] for p in points)
+    assert max(p[1] for p in sampled) == max(p[1] for p in points)
+    assert [p[0] for p in sampled] == sorted(p[0] for p in sampled)
+
+
+def test_year_series_is_downsampled_server_side(client, history_store):
+    body = client.get("/feeds/series", params={"days": 365, "points": 2000, "method": "minmax"}).json()
+    raw = [r['consumption'] for r in history_store.series("national_consolidated", "FR", start=body['start'])]
+    values = [value for _, value in body['points']]
+
+    assert body['status'] == "success"
+    assert body['raw_count'] == 365 * 96
+    assert body['count'] == len(body['points']) <= 2002
+    assert body['points'][-1][0] == body['end']
+    assert min(values) == min(raw) and max(values) == max(raw)
+
+
+def test_lttb_series_has_requested_size(client):
+    body = client.get("/feeds/series", params={"days": 365, "points": 2000}).json()
+
+    assert body['count'] == len(body['points']) == 2000
+    assert body['points'][-1][0] == body['end']
+
+
+def test_series_revalidates_and_rejects_unknown_columns(client):
+    first = client.get("/feeds/series", params={"days": 7, "method": "minmax"})
+    again = client.get("/feeds/series", params={"days": 7, "method": "minmax"},
+                       headers={"If-None-Match": first.headers["etag"]})
+
+    assert again.status_code == 304
+    assert client.get("/feeds/series", params={"column": "nope"}).json()['status'] == "error"
+
+
+def test_latest_and_mix_feeds(client):
+    latest = client.get("/feeds/latest").json()
+    mix = client.get("/feeds/mix").json()
+
+    assert latest['snapshot']['time'].startswith("2024-01-15")
+    assert latest['snapshot']['consumption_MW'] > 0
+    shares = [s['share'] for s in mix['mix']['sources']]
+    assert mix['mix']['sources'][0]['source'] == "nuclear"
+    assert sum(shares) == pytest.approx(100, abs=0.1)
+
+
+def test_feed_reports_unreachable_upstream(client, monkeypatch):
+    def unreachable(limit):
+        raise requests.ConnectionError("eco2mix unreachable")
+
+    monkeypatch.setattr(feeds, "get_latest", unreachable)
+    body = client.get("/feeds/latest").json()
+
+    assert body['status'] == "error"
+    assert "unreachable" in body['message']
+
+
+def test_feed_without_records_has_no_validators(client, monkeypatch):
+    monkeypatch.setattr(feeds, "get_latest", lambda limit: ([], False))
+    response = client.get("/feeds/latest")
+
+    assert response.status_code == 200
+    assert response.json()['status'] == "success"
+    assert "etag" not in response.headers
+
+
+def test_series_ends_at_the_newest_filled_in_value(offline, tmp_path, monkeypatch):
+    from app.main import app
+    from app.tools.datasets import get_dataset
+
+    store = RegionStore(str(tmp_path / "eco2mix.sqlite3"))
+    monkeypatch.setattr(region_store, "_store", store)
+    regional = get_dataset("regional")
+    rows = [{"region": "84", "ts": f"2024-01-15T22:{minute}:00Z", "consumption": 8000.0 + i}
+            for i, minute in enumerate(("00", "15", "30"))]
+    store.upsert(regional, rows + [{"region": "84", "ts": "2024-01-15T22:45:00Z", "consumption": None}])
+    client = TestClient(app)
+    params = {"region": "84", "days": 1}
+
+    first = client.get("/feeds/series", params=params)
+    store.upsert(regional, [{"region": "84", "ts": "2024-01-15T22:45:00Z", "consumption": 8100.0}])
+    again = client.get("/feeds/series", params=params, headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.json()['end'] == first.json()['points'][-1][0] == "2024-01-15T22:30:00Z"
+    assert again.status_code == 200
+    assert again.json()['points'][-1] == ["2024-01-15T22:45:00Z", 8100.0]
+    store.close()
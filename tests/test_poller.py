@@ -0,0 +1,67 @@
+# tests/test_poller.py
+import pytest
+
+from app import config
+from app.cache import ANALYTICS, get_cache
+from app.poller import Eco2mixPoller
+from app.tools import region_store
+from app.tools.region_store import RegionStore
+from app.tools.snapshots import latest_snapshots, publication_id
+from benchmarks.stubs import Eco2mixStub
+
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    store = RegionStore(str(tmp_path / "eco2mix.sqlite3"))
+    monkeypatch.setattr(region_store, "_store", store)
+    with Eco2mixStub() as stub:
+        monkeypatch.setattr(config, "ECO2MIX_API_ROOT", stub.api_root)
+        latest_snapshots().cache.invalidate()
+        yield stub
+    store.close()
+
+
+def test_publication_id_skips_unfilled_rows():
+    records = [{"date_heure": "2024-01-15T23:45:00+01:00", "consommation": None},
+               {"date_heure": "2024-01-15T23:30:00+01:00", "consommation": 53030}]
+
+    assert publication_id(records) == "2024-01-15T23:30:00+01:00"
+    assert publication_id([]) == ""
+
+
+def test_filling_the_newest_row_is_a_new_publication(stub):
+    records = stub.datasets["eco2mix-national-tr"]
+    newest = max(records, key=lambda r: r["date_heure"])
+    consumption, newest["consommation"] = newest["consommation"], None
+    poller = Eco2mixPoller(interval=0)
+    poller.poll_once()
+    get_cache(ANALYTICS).set("analyze:mix:old", "stale analysis")
+
+    newest["consommation"] = consumption
+
+    assert poller.poll_once()
+    assert get_cache(ANALYTICS).get("analyze:mix:old") is None
+    assert not poller.poll_once()
+
+
+def test_every_host_fills_its_store_from_the_shared_tier(stub, tmp_path, monkeypatch):
+    from app.tools.regional import latest_by_region
+
+    poller = Eco2mixPoller(interval=0)
+    poller.poll_once()
+    poller.ingest_store()
+    served = stub.requests_served
+
+    other_host = RegionStore(str(tmp_path / "other-host.sqlite3"))
+    monkeypatch.setattr(region_store, "_store", other_host)
+    poller.ingest_store()
+
+    assert stub.requests_served == served
+    assert "FR" in other_host.latest("national")
+    assert len(other_host.latest("regional")) == 12
+
+    third_host = RegionStore(str(tmp_path / "third-host.sqlite3"))
+    assert set(latest_by_region(["32", "76"], store=third_host)) == {"32", "76"}
+    assert stub.requests_served == served
+    other_host.close()
+    third_host.close()
@@ -0,0 +1,128 @@
+# tests/test_regions.py
+import pytest
+
+from app.tools import region_store
+from app.tools.datasets import find_regions, get_dataset, normalize
+from app.tools.region_store import RegionStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = RegionStore(str(tmp_path / "eco2mix.sqlite3"))
+    monkeypatch.setattr(region_store, "_store", store)
+    yield store
+    store.close()
+
+
+def row(region, ts, **values):
+    return {"region": region, "ts": ts, **values}
+
+
+def test_find_regions_in_order_of_mention():
+    assert find_regions("wind in Hauts-de-France vs Occitanie") == ["32", "76"]
+    assert find_regions("Compare ile de france and PACA consumption") == ["11", "93"]
+    assert find_regions("How much nuclear power?") == []
+
+
+@pytest.mark.parametrize("query", [
+    "nuclear output in the north",
+    "What is the nuclear output in the nord?",
+    "energy mix in Paris terms",
+    "Is the grid centre of gravity shifting to renewables?",
+    "How much power does France produce for the Paris region and Provence?",
+])
+def test_national_queries_are_not_routed_to_regions(query):
+    assert find_regions(query) == []
+
+
+def test_normalize_maps_dataset_fields():
+    record = {"code_insee_region": "32", "date_heure": "2024-01-15T23:30:00+01:00",
+              "eolien": 3400, "consommation": 6700, "solaire": None}
+    normalized = normalize(get_dataset("regional"), record)
+
+    assert normalized["region"] == "32"
+    assert normalized["ts"] == "2024-01-15T22:30:00Z"
+    assert normalized["wind"] == 3400.0 and normalized["solar"] is None
+
+
+def test_latest_skips_unpublished_rows_and_filters_regions(store):
+    regional = get_dataset("regional")
+    store.upsert(regional, [
+        row("32", "2024-01-15T22:30:00Z", consumption=6700.0, wind=3400.0),
+        row("32", "2024-01-15T22:45:00Z"),
+        row("76", "2024-01-15T22:15:00Z", consumption=6600.0, wind=1200.0),
+        row("11", "2024-01-15T22:30:00Z", consumption=9900.0),
+    ])
+
+    latest = store.latest("regional", ["32", "76"])
+
+    assert set(latest) == {"32", "76"}
+    assert latest["32"]["ts"] == "2024-01-15T22:30:00Z"
+    assert latest["76"]["wind"] == 1200.0
+    assert [r["ts"] for r in store.series("regional", "32")] == ["2024-01-15T22:30:00Z", "2024-01-15T22:45:00Z"]
+
+
+def test_prune_keeps_recent_rows_per_region(store):
+    regional = get_dataset("regional")
+    store.upsert(regional, [
+        row("32", "2023-12-01T00:00:00Z", consumption=6000.0),
+        row("32", "2024-01-10T00:00:00Z", consumption=6100.0),
+        row("32", "2024-01-15T22:30:00Z", consumption=6700.0),
+        row("76", "2023-11-01T00:00:00Z", consumption=5000.0),
+    ])
+
+    assert store.prune("regional", keep_days=7) == 1
+
+    assert [r["ts"] for r in store.series("regional", "32")] == ["2024-01-10T00:00:00Z", "2024-01-15T22:30:00Z"]
+    assert store.latest("regional")["76"]["ts"] == "2023-11-01T00:00:00Z"
+
+
+def test_ingest_fetches_all_regions(offline, store):
+    from app.tools.regional import ingest_regions
+
+    written = ingest_regions()
+
+    assert written == 96
+    assert len(store.latest("regional")) == 12
+
+
+def test_regional_ingest_works_before_the_snapshot_cache_exists(offline, store, monkeypatch):
+    from app import cache
+    from app.tools import snapshots
+    from app.tools.regional import ingest_regions
+
+    monkeypatch.setattr(cache, "_caches", {})
+    monkeypatch.setattr(snapshots, "_latest", None)
+
+    assert ingest_regions(regions=["32"]) > 0
+    assert snapshots.get_latest(limit=1)[0]
+
+
+def test_region_query_is_answered_from_the_store(offline, store):
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    eco2mix_stub, _ = offline
+    client = TestClient(app)
+    query = {"query": "wind in Hauts-de-France vs Occitanie"}
+    first = client.post("/analyze", json=query).json()
+    served = eco2mix_stub.requests_served
+    second = client.post("/analyze", json=query).json()
+
+    assert first['status'] == "success"
+    assert list(first['regions']) == ["Hauts-de-France", "Occitanie"]
+    assert first['analysis'].startswith("Wind: Hauts-de-France")
+    assert second == first
+    assert eco2mix_stub.requests_served == served
+
+
+def test_regions_endpoint(offline, store):
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    body = TestClient(app).get("/regions", params={"region": "32,Occitanie"}).json()
+
+    assert [r['code'] for r in body['data']] == ["32", "76"]
+    assert body['data'][0]['wind_MW'] > 0
@@ -0,0 +1,147 @@
+# tests/test_resilience.py
+import time
+
+import pytest
+
+from app.cache import RedisConnection, TwoLevelCache
+from app.tools.resilience import (
+    CircuitBreaker, CircuitOpenError, StaleWhileRevalidate, retry_with_jitter,
+)
+
+
+def failing():
+    raise ConnectionError("eco2mix down")
+
+
+def local_cache():
+    return TwoLevelCache("test-swr", ttl=60, connection=RedisConnection(url="redis://127.0.0.1:1/0"))
+
+
+def test_breaker_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    calls = []
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(lambda: calls.append(1) or failing())
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: calls.append(1))
+
+    assert len(calls) == 2
+    assert breaker.status()['state'] == "open"
+
+
+def test_breaker_half_open_probe_closes_circuit():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    with pytest.raises(ConnectionError):
+        breaker.call(failing)
+
+    time.sleep(0.06)
+
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.status()['state'] == "closed"
+
+
+def test_retry_only_retries_transient_errors():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            failing()
+        return "ok"
+
+    assert retry_with_jitter(flaky, attempts=3, base_delay=0.001) == "ok"
+    with pytest.raises(ValueError):
+        retry_with_jitter(lambda: calls.append(1) or int("x"), attempts=3,
+                          retry_if=lambda e: isinstance(e, ConnectionError))
+    assert len(calls) == 4
+
+
+def test_stale_value_is_served_while_upstream_fails():
+    swr = StaleWhileRevalidate(local_cache(), fresh_for=0.01)
+    swr.store("latest", [1, 2, 3])
+    time.sleep(0.02)
+
+    value, _, stale = swr.get("latest", failing)
+
+    assert value == [1, 2, 3]
+    assert stale
+
+
+def test_stale_value_is_refreshed_in_background():
+    swr = StaleWhileRevalidate(local_cache(), fresh_for=0.01)
+    swr.store("latest", "old")
+    time.sleep(0.02)
+
+    assert swr.get("latest", lambda: "new")[0] == "old"
+    deadline = time.monotonic() + 2
+    while swr.peek("latest")['value'] != "new" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert swr.get("latest", lambda: "newer") == ("new", pytest.approx(0, abs=1), False)
+
+
+def test_open_breaker_fails_fast_against_erroring_upstream(monkeypatch):
+    from app import config
+    from app.tools.eco2mix_client import Eco2mixClient, Eco2mixError
+    from benchmarks.stubs import Eco2mixStub
+
+    with Eco2mixStub(error_rate=1.0) as stub:
+        monkeypatch.setattr(config, "ECO2MIX_API_ROOT", stub.api_root)
+        client = Eco2mixClient()
+        client.breaker = CircuitBreaker("test-eco2mix", failure_threshold=2, reset_timeout=60)
+
+        for _ in range(2):
+            with pytest.raises(Eco2mixError):
+                client.get_records({"limit": 1}, attempts=1)
+        served = stub.requests_served
+        with pytest.raises(CircuitOpenError):
+            client.get_records({"limit": 1})
+
+        assert stub.requests_served == served
+
+
+def test_client_errors_never_open_the_circuit(monkeypatch):
+    from app import config
+    from app.tools.eco2mix_client import Eco2mixClient, Eco2mixError
+    from benchmarks.stubs import Eco2mixStub
+
+    with Eco2mixStub() as stub:
+        monkeypatch.setattr(config, "ECO2MIX_API_ROOT", stub.api_root)
+        client = Eco2mixClient(dataset="no-such-dataset")
+        client.breaker = CircuitBreaker("test-eco2mix-4xx", failure_threshold=2, reset_timeout=60)
+
+        for _ in range(5):
+            with pytest.raises(Eco2mixError) as error:
+                client.get_records({"limit": 1})
+            assert error.value.status_code == 404
+
+        assert client.breaker.status()['state'] == "closed"
+        assert client.breaker.status()['consecutive_failures'] == 0
+
+
+def test_client_error_releases_half_open_probe():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    with pytest.raises(ConnectionError):
+        breaker.call(failing)
+    time.sleep(0.06)
+
+    with pytest.raises(ValueError):
+        breaker.call(lambda: int("x"), failure_if=lambda e: isinstance(e, ConnectionError))
+
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.status()['state'] == "closed"
+
+
+def test_health_reports_breakers_without_calling_upstream(offline):
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    eco2mix_stub, _ = offline
+    client = TestClient(app)
+    before = eco2mix_stub.requests_served
+    body = client.get("/health").json()
+
+    assert "circuits" in body and "snapshot" in body
+    assert eco2mix_stub.requests_served == before
@@ -0,0 +1,109 @@
+# tests/test_router.py
+import pytest
+
+from app.workflows.router import QueryRouter
+from benchmarks.stubs import deterministic_embedding
+
+
+class HashEmbeddings:
+    """Deterministic stand-in for OllamaEmbeddings"""
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [deterministic_embedding(t) for t in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        return deterministic_embedding(text)
+
+
+class FailingEmbeddings:
+    def embed_documents(self, texts):
+        raise ConnectionError("ollama down")
+
+    embed_query = embed_documents
+
+
+@pytest.fixture
+def router(tmp_path):
+    return QueryRouter(embeddings=HashEmbeddings(), cache_path=str(tmp_path / "centroids.json"),
+                       llm_fallback=False)
+
+
+@pytest.mark.parametrize("query, intent, agent", [
+    ("How much are the wind turbines producing right now?", "wind", "renewable_expert"),
+    ("What is the carbon intensity of the grid today?", "carbon", "data_analyst"),
+    ("Break down electricity production by source", "mix", "data_analyst"),
+])
+def test_routes_to_nearest_centroid(router, query, intent, agent):
+    decision = router.route(query)
+
+    assert (decision.intent, decision.agent, decision.source) == (intent, agent, "centroid")
+
+
+def test_decisions_are_cached(router):
+    router.route("Solar generation today")
+    calls = router.embeddings.calls
+    router.route("  solar generation   TODAY ")
+
+    assert router.embeddings.calls == calls
+
+
+def test_centroids_are_reused_from_disk(router, tmp_path):
+    router.centroids()
+    embeddings = HashEmbeddings()
+    again = QueryRouter(embeddings=embeddings, cache_path=router.cache_path)
+
+    assert again.centroids() == router.centroids()
+    assert embeddings.calls == 1  # one probe instead of every example
+
+
+def test_centroids_from_other_embeddings_are_rebuilt(router):
+    class OtherEmbeddings(HashEmbeddings):
+        """Same class name and URL as the cached backend, different vectors"""
+        def embed_documents(self, texts):
+            self.calls += 1
+            return [deterministic_embedding("other " + t) for t in texts]
+
+        def embed_query(self, text):
+            self.calls += 1
+            return deterministic_embedding("other " + text)
+
+    OtherEmbeddings.__name__ = "HashEmbeddings"
+    router.centroids()
+    again = QueryRouter(embeddings=OtherEmbeddings(), cache_path=router.cache_path)
+
+    assert again.centroids() != router.centroids()
+
+
+def test_fingerprint_depends_on_embeddings_backend(tmp_path):
+    class Remote(HashEmbeddings):
+        def __init__(self, base_url):
+            super().__init__()
+            self.base_url = base_url
+
+    local = QueryRouter(embeddings=Remote("http://localhost:11434"))
+    stub = QueryRouter(embeddings=Remote("http://127.0.0.1:5000"))
+
+    assert local.fingerprint() != stub.fingerprint()
+
+
+def test_low_confidence_falls_back_to_llm(tmp_path):
+    class FakeLLM:
+        def invoke(self, prompt):
+            return "consumption"
+
+    router = QueryRouter(embeddings=HashEmbeddings(), llm=FakeLLM(),
+                         cache_path=str(tmp_path / "centroids.json"), min_confidence=1.1)
+    decision = router.route("zzz qqq")
+
+    assert (decision.intent, decision.source) == ("consumption", "llm")
+
+
+def test_keyword_fallback_when_embeddings_unavailable(tmp_path):
+    router = QueryRouter(embeddings=FailingEmbeddings(), cache_path=str(tmp_path / "centroids.json"))
+    decision = router.route("Is wind compensating for low hydro?")
+
+    assert (decision.intent, decision.agent, decision.source) == ("wind", "renewable_expert", "keyword")
@@ -0,0 +1,9 @@
+# tests/test_startup.py
+from benchmarks.import_profile import check_budget, profile_imports
+
+
+def test_app_boot_stays_lazy_and_small():
+    report = profile_imports()
+
+    # Generous budget for CI noise; python -m benchmarks.import_profile enforces the tight one
+    assert check_budget(report, max_seconds=5.0, max_rss_mb=300) == []